@@ -1,10 +1,14 @@
 import streamlit as st
-import numpy as np
-import joblib
+from features import MODELS
+from prediction_cache import get_cache
+from audit_log import AuditError, get_audit_log
+from metrics import StageTimer, write_prometheus
 
-# Load model
-with open("heart_disease_model.pkl", "rb") as file:
-    model = joblib.load(file)
+# Load model (cached across reruns)
+stages = StageTimer("heart")
+spec = MODELS["heart"]
+entry = spec.entry()
+stages.lap("load")
 
 # Page config
 st.set_page_config(page_title="❤️ Heart Disease Predictor", layout="wide")
@@ -43,25 +47,31 @@ slope = st.sidebar.selectbox("📊 SLOPE OF ST SEGMENT", ["UPSLOPING (0)", "FLAT
 ca = st.sidebar.selectbox("🔬 NUMBER OF MAJOR VESSELS COLORED (0–3)", [0, 1, 2, 3])
 thal = st.sidebar.selectbox("🧬 THALASSEMIA", ["NORMAL (0)", "FIXED DEFECT (1)", "REVERSIBLE DEFECT (2)"])
 
-# Convert to numeric
-sex_val = 1 if sex == "MALE" else 0
-cp_val = int(cp.split("(")[-1][0])
-fbs_val = int(fbs.split("(")[-1][0])
-restecg_val = int(restecg.split("(")[-1][0])
-exang_val = int(exang.split("(")[-1][0])
-slope_val = int(slope.split("(")[-1][0])
-thal_val = int(thal.split("(")[-1][0])
-
 # Prediction
 st.subheader("🔎 Prediction Result")
 if st.button("🔍 PREDICT HEART DISEASE"):
-    input_data = np.array([[age, sex_val, cp_val, trestbps, chol, fbs_val,
-                            restecg_val, thalach, exang_val, oldpeak,
-                            slope_val, ca, thal_val]])
+    stages.restart()
+    # The schema decodes the option labels and checks every value's range
+    input_data = spec.schema.fill_row({
+        "age": age, "sex": sex, "cp": cp, "trestbps": trestbps, "chol": chol,
+        "fbs": fbs, "restecg": restecg, "thalach": thalach, "exang": exang,
+        "oldpeak": oldpeak, "slope": slope, "ca": ca, "thal": thal,
+    })
+    stages.lap("input")
 
-    proba = model.predict_proba(input_data)[0]
-    prediction = model.predict(input_data)[0]
+    # One pass: the label is derived from the probabilities, and reruns
+    # with unchanged inputs are answered from the cache
+    labels, probas = get_cache("heart").predict(entry, input_data)
+    prediction, proba = labels[0], probas[0]
     risk_percent = proba[1] * 100
+    stages.lap("predict")
+    # Queued for the audit log; written by a background thread
+    try:
+        get_audit_log("heart", spec.columns).record(entry.checksum, input_data, labels, probas)
+    except AuditError as e:
+        st.error(f"❌ Prediction not shown: it could not be recorded in the audit log ({e})")
+        st.stop()
+    stages.lap("audit")
 
     if prediction == 0:
         st.success("✅ The person is **NOT LIKELY** to have heart disease.")
@@ -71,6 +81,8 @@ if st.button("🔍 PREDICT HEART DISEASE"):
         st.error("⚠️ The person **MAY HAVE** heart disease. Please consult a doctor.")
         st.metric(label="🧾 Heart Disease Risk", value=f"{risk_percent:.2f}%", delta="↑ HIGH", delta_color="inverse")
         st.snow()
+    stages.lap("render")
+    write_prometheus()
 
 # Feature info
 with st.expander("ℹ️ FEATURE INFORMATION & MEANING", expanded=False):
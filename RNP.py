@@ -1,16 +1,17 @@
 import streamlit as st
-import numpy as np
-import pandas as pd
-import joblib
-from sklearn.preprocessing import StandardScaler
+from features import MODELS
+from scoring import predict_with_proba
+from metrics import StageTimer, write_prometheus
 
 # Page configuration
 st.set_page_config(page_title="🌧️ Rainfall Predictor", layout="wide")
 
 # Load trained model
+stages = StageTimer("rainfall")
 try:
-    with open("rainfall_prediction_model.pkl", "rb") as file:
-        model = joblib.load(file)
+    spec = MODELS["rainfall"]
+    model = spec.load()
+    stages.lap("load")
     st.success("✅ Model loaded successfully!")
 except Exception as e:
     st.error(f"❌ Failed to load model: {e}")
@@ -40,23 +41,26 @@ winddirection = st.sidebar.number_input("🌬️ WIND DIRECTION (degrees 0-360)"
 st.subheader("🔍 Prediction Result")
 
 if st.button("🔮 Predict Rainfall"):
-    input_data = pd.DataFrame({
-        'pressure': [pressure],
-        'dewpoint': [dewpoint],
-        'humidity': [humidity],
-        'cloud': [cloud],
-        'sunshine': [sunshine],
-        'winddirection': [winddirection],
-        'windspeed': [windspeed]
-    })
+    stages.restart()
+    try:
+        # Filled by name into the model's column order (temperature is not a model input)
+        input_data = spec.schema.fill_row({
+            'pressure': pressure,
+            'dewpoint': dewpoint,
+            'humidity': humidity,
+            'cloud': cloud,
+            'sunshine': sunshine,
+            'winddirection': winddirection,
+            'windspeed': windspeed
+        })
+        stages.lap("input")
 
-    with st.expander("🧐 See input data sent to model"):
-        st.write(input_data)
+        with st.expander("🧐 See input data sent to model"):
+            st.write(dict(zip(spec.columns, input_data[0].tolist())))
 
-    try:
-        prediction = model.predict(input_data)
-        proba = model.predict_proba(input_data)
+        prediction, proba = predict_with_proba(model, input_data)
         rain_prob = proba[0][1] * 100
+        stages.lap("predict")
 
         st.metric("Probability of Rain", f"{rain_prob:.1f}%")
 
@@ -65,9 +69,10 @@ if st.button("🔮 Predict Rainfall"):
             st.balloons()
         else:
             st.info(f"🌤️ **No rain expected ({rain_prob:.1f}% chance). Enjoy your day!**")
+        stages.lap("render")
+        write_prometheus()
     except Exception as e:
         st.error(f"❌ Prediction Error: {e}")
-        st.error("Please check if the model expects exactly these features in this order.")
 
 # Input Explanation
 with st.expander("ℹ️ What do the inputs mean?"):
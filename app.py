@@ -0,0 +1,35 @@
+"""One Streamlit server for every app, each script a page.
+
+    streamlit run app.py
+
+Pages run in the same interpreter, so streamlit, numpy and the model
+registry are imported once and every artifact is loaded once, however many
+pages and sessions use it. The scripts are unchanged and still run on their
+own with ``streamlit run Heart.py`` (or forked by launcher.py).
+benchmarks/host_memory.py compares the resident memory of this host with one
+process per app.
+"""
+
+import streamlit as st
+
+PAGES = {
+    "Health": [
+        st.Page("Heart.py", title="Heart disease", icon="❤️", url_path="heart", default=True),
+        st.Page("diabetes.py", title="Diabetes", icon="🩺", url_path="diabetes"),
+        st.Page("breast.py", title="Breast cancer", icon="🎀", url_path="breast"),
+        st.Page("parkinsons.py", title="Parkinson's", icon="🧠", url_path="parkinsons"),
+    ],
+    "Environment": [
+        st.Page("wine.py", title="Wine quality", icon="🍷", url_path="wine"),
+        st.Page("RNP.py", title="Rainfall", icon="🌧️", url_path="rainfall"),
+    ],
+    "Business": [
+        st.Page("churn.py", title="Customer churn", icon="📉", url_path="churn"),
+        st.Page("movies.py", title="Movie recommender", icon="🎬", url_path="movies"),
+    ],
+    "Tools": [
+        st.Page("cgpa.py", title="CGPA calculator", icon="🎓", url_path="cgpa"),
+    ],
+}
+
+st.navigation(PAGES).run()
@@ -0,0 +1,439 @@
+"""Append-only binary audit log of predictions.
+
+Every prediction shown by the clinical apps (Heart, diabetes, breast) is
+recorded with its inputs, label, class probabilities, the model artifact's
+checksum and a timestamp. ``AuditLog.record`` only copies the rows into a
+preallocated ring buffer; a background thread drains the buffer in batches,
+so the request path never waits on the disk. When the buffer is full (the
+disk is slow or failing) ``record`` blocks until the writer catches up and
+raises ``AuditError`` after ``AUDIT_BLOCK_SECONDS``: a prediction is never
+dropped from the log without the caller knowing.
+
+Each process writes its own files, ``<dir>/<model>.<pid>.<seq>.audit``, and
+starts a new one once a file passes ``AUDIT_MAX_BYTES``. A file is a header
+followed by column-oriented blocks, one per batch and checksum:
+
+    header  b"PAUDIT\\x00\\x01", uint32 length, JSON {model, columns, n_classes}
+    block   b"AUDB", uint32 n, 32-byte SHA-256 of the model artifact, then
+            timestamp int64[n] (ns since the epoch), inputs float64[n, features],
+            label int64[n], proba float64[n, n_classes] (NaN without probabilities)
+
+All little-endian. A failed write is cut back off the file before it is
+retried, so blocks are never partial or duplicated. ``read_audit`` maps the files and views every column
+with ``np.frombuffer``, so a scan costs little more than reading the bytes.
+
+    log = get_audit_log("heart", spec.columns)
+    log.record(entry.checksum, input_data, labels, probas)
+
+    python audit_log.py audit/ --model heart --csv heart_audit.csv
+"""
+
+import argparse
+import atexit
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+
+import config
+
+FILE_MAGIC = b"PAUDIT\x00\x01"
+BLOCK_MAGIC = b"AUDB"
+_FILE_HEADER = struct.Struct("<8sI")
+_BLOCK_HEADER = struct.Struct("<4sI32s")
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+class AuditError(RuntimeError):
+    """A prediction could not be recorded."""
+
+
+class AuditLog:
+    """Ring-buffered, background-written audit log for one model."""
+
+    def __init__(self, model, columns, n_classes=2, directory=None, capacity=None,
+                 max_bytes=None, flush_seconds=None, block_seconds=None):
+        self.model = model
+        self.columns = list(columns)
+        self.n_classes = n_classes
+        self.directory = directory or config.AUDIT_DIR
+        self.capacity = capacity or config.AUDIT_BUFFER_RECORDS
+        self.max_bytes = max_bytes or config.AUDIT_MAX_BYTES
+        self.flush_seconds = flush_seconds or config.AUDIT_FLUSH_SECONDS
+        self.block_seconds = block_seconds or config.AUDIT_BLOCK_SECONDS
+
+        # Ring buffer: _count unwritten records starting at slot _start
+        self._timestamp = np.empty(self.capacity, dtype=np.int64)
+        self._inputs = np.empty((self.capacity, len(self.columns)), dtype=np.float64)
+        self._label = np.empty(self.capacity, dtype=np.int64)
+        self._proba = np.empty((self.capacity, n_classes), dtype=np.float64)
+        self._checksum = np.empty(self.capacity, dtype="S32")
+        self._start = 0
+        self._count = 0
+
+        self._changed = threading.Condition()
+        self._thread = None
+        self._flush_requested = False
+        self._closed = False
+        self._file = None
+        self._file_bytes = 0
+        self._seq = 0
+
+        self.records = 0
+        self.written = 0
+        self.blocked = 0
+        self.blocked_seconds = 0.0
+        self.files = 0
+        self.write_errors = 0
+        self.error = None
+
+    def record(self, checksum, X, labels, proba=None):
+        """Queue one row (or a batch) of predictions; returns without touching the disk.
+
+        ``checksum`` is the model artifact's SHA-256 hex digest
+        (``ModelEntry.checksum``), ``X`` the model input, ``labels`` the
+        integer predictions and ``proba`` the class probabilities or None.
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.columns))
+        n = len(X)
+        labels = np.asarray(labels, dtype=np.int64).reshape(n)
+        if proba is None:
+            proba = np.full((n, self.n_classes), np.nan)
+        else:
+            proba = np.asarray(proba, dtype=np.float64).reshape(n, self.n_classes)
+        if n > self.capacity:
+            raise ValueError(f"{n} records do not fit a buffer of {self.capacity}")
+        digest = bytes.fromhex(checksum)
+        now = time.time_ns()
+
+        with self._changed:
+            if self._closed:
+                raise AuditError(f"{self.model}: audit log is closed")
+            if self._thread is None:
+                # Started on first use, so a process can fork before recording
+                self._thread = threading.Thread(target=self._run, name=f"audit-{self.model}",
+                                                daemon=True)
+                self._thread.start()
+            if self._count + n > self.capacity:
+                # Backpressure: wait for the writer instead of dropping records
+                self.blocked += 1
+                start = time.monotonic()
+                self._flush_requested = True
+                self._changed.notify_all()
+                fits = self._changed.wait_for(lambda: self._count + n <= self.capacity,
+                                              self.block_seconds)
+                self.blocked_seconds += time.monotonic() - start
+                if not fits:
+                    reason = f": {self.error}" if self.error else ""
+                    raise AuditError(f"{self.model}: audit buffer still full after "
+                                     f"{self.block_seconds:g}s{reason}")
+
+            slots = (self._start + self._count + np.arange(n)) % self.capacity
+            self._timestamp[slots] = now
+            self._inputs[slots] = X
+            self._label[slots] = labels
+            self._proba[slots] = proba
+            self._checksum[slots] = digest
+            self._count += n
+            self.records += n
+            if self._count >= self.capacity // 2:
+                self._changed.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until everything recorded so far is written; return False on timeout.
+
+        ``timeout=None`` waits indefinitely, even while the disk is failing.
+        """
+        with self._changed:
+            if self._thread is None:
+                return True
+            target = self.records
+            self._flush_requested = True
+            self._changed.notify_all()
+            return self._changed.wait_for(lambda: self.written >= target, timeout)
+
+    def close(self, timeout=10):
+        """Flush, stop the writer and close the current file."""
+        self.flush(timeout)
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._changed:
+                self._changed.wait_for(
+                    lambda: self._closed or self._flush_requested
+                    or self._count >= self.capacity // 2, self.flush_seconds)
+                self._flush_requested = False
+                start, n, closing = self._start, self._count, self._closed
+            if n:
+                # The slots being written are not reused until _start moves
+                slots = (start + np.arange(n)) % self.capacity
+                try:
+                    self._write(slots)
+                # Not just OSError: the writer thread must outlive any failure,
+                # or record() and flush() would wait on it forever
+                except Exception as e:
+                    with self._changed:
+                        self.error = e
+                        self.write_errors += 1
+                    if closing:
+                        break
+                    time.sleep(self.flush_seconds)
+                    continue
+                with self._changed:
+                    self._start = (start + n) % self.capacity
+                    self._count -= n
+                    self.written += n
+                    self.error = None
+                    self._changed.notify_all()
+            elif closing:
+                break
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.makedirs(self.directory, exist_ok=True)
+        header = json.dumps({"model": self.model, "columns": self.columns,
+                             "n_classes": self.n_classes}).encode()
+        while True:
+            self._seq += 1
+            path = os.path.join(self.directory, f"{self.model}.{os.getpid()}.{self._seq:06d}.audit")
+            try:
+                # Unbuffered, so a failed write leaves nothing queued in Python
+                file = open(path, "xb", buffering=0)
+                break
+            except FileExistsError:
+                continue
+        try:
+            _write_all(file, _FILE_HEADER.pack(FILE_MAGIC, len(header)) + header)
+        except Exception:
+            # A file without a complete header is unreadable: remove it
+            file.close()
+            os.remove(path)
+            raise
+        self._file = file
+        self._file_bytes = _FILE_HEADER.size + len(header)
+        self.files += 1
+
+    def _write(self, slots):
+        checksums = self._checksum[slots]
+        # One block per run of records from the same artifact
+        cuts = np.flatnonzero(checksums[1:] != checksums[:-1]) + 1
+        chunks = []
+        for run in np.split(slots, cuts):
+            chunks += [
+                _BLOCK_HEADER.pack(BLOCK_MAGIC, len(run), self._checksum[run[0]]),
+                self._timestamp[run].tobytes(),
+                self._inputs[run].tobytes(),
+                self._label[run].tobytes(),
+                self._proba[run].tobytes(),
+            ]
+        data = b"".join(chunks)
+        if self._file is None or self._file_bytes >= self.max_bytes:
+            self._open()
+        try:
+            _write_all(self._file, data)
+        except Exception:
+            # Drop whatever part of the batch reached the file, so the retry
+            # appends it whole; if that fails too, retry in a fresh file
+            try:
+                self._file.truncate(self._file_bytes)
+                self._file.seek(self._file_bytes)
+            except OSError:
+                self._file.close()
+                self._file = None
+            raise
+        self._file_bytes += len(data)
+
+    def stats(self):
+        with self._changed:
+            return {
+                "records": self.records,
+                "written": self.written,
+                "pending": self._count,
+                "capacity": self.capacity,
+                "blocked": self.blocked,
+                "blocked_seconds": self.blocked_seconds,
+                "files": self.files,
+                "write_errors": self.write_errors,
+            }
+
+
+def _write_all(file, data):
+    # Raw files may write fewer bytes than asked
+    view = memoryview(data)
+    while view:
+        view = view[file.write(view):]
+
+
+def get_audit_log(model, columns, n_classes=2):
+    """Return the process-wide audit log for ``model``, creating it on first use."""
+    with _logs_lock:
+        log = _logs.get(model)
+        if log is None:
+            log = _logs[model] = AuditLog(model, columns, n_classes)
+        return log
+
+
+def audit_stats():
+    """Return ``{model: stats dict}`` for every audit log created so far."""
+    with _logs_lock:
+        logs = sorted(_logs.items())
+    return {model: log.stats() for model, log in logs}
+
+
+@atexit.register
+def close_all(timeout=10):
+    """Write out every buffered record (run at interpreter exit)."""
+    with _logs_lock:
+        logs = list(_logs.values())
+    for log in logs:
+        log.close(timeout)
+
+
+def _read_file(path):
+    """Return ``(header, blocks)`` for one file; blocks hold zero-copy column views."""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise ValueError(f"{path}: empty file")
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, length = _FILE_HEADER.unpack_from(data, 0)
+    if magic != FILE_MAGIC:
+        raise ValueError(f"{path}: not an audit log")
+    header = json.loads(bytes(data[_FILE_HEADER.size:_FILE_HEADER.size + length]))
+    n_features, n_classes = len(header["columns"]), header["n_classes"]
+    row_bytes = 8 * (1 + n_features + 1 + n_classes)
+
+    blocks = []
+    offset = _FILE_HEADER.size + length
+    while offset < len(data):
+        if data[offset:offset + len(BLOCK_MAGIC)] != BLOCK_MAGIC[:len(data) - offset]:
+            raise ValueError(f"{path}: corrupt block at byte {offset}")
+        # A short last block is a write cut off by a crash: warn and stop
+        if len(data) - offset < _BLOCK_HEADER.size:
+            warnings.warn(f"{path}: truncated last block at byte {offset} ignored")
+            break
+        magic, n, digest = _BLOCK_HEADER.unpack_from(data, offset)
+        if len(data) - offset - _BLOCK_HEADER.size < n * row_bytes:
+            warnings.warn(f"{path}: truncated last block at byte {offset} ignored")
+            break
+        end = offset + _BLOCK_HEADER.size + n * row_bytes
+        # Each block must be followed by the next one's magic or the end of the file
+        if end < len(data) and data[end:end + len(BLOCK_MAGIC)] != BLOCK_MAGIC[:len(data) - end]:
+            raise ValueError(f"{path}: corrupt block at byte {offset}")
+        offset += _BLOCK_HEADER.size
+        columns = {}
+        for name, dtype, width in (("timestamp", np.int64, 1), ("inputs", np.float64, n_features),
+                                   ("label", np.int64, 1), ("proba", np.float64, n_classes)):
+            values = np.frombuffer(data, dtype=dtype, count=n * width, offset=offset)
+            columns[name] = values.reshape(n, width) if name in ("inputs", "proba") else values
+            offset += 8 * n * width
+        columns["checksum"] = digest.hex()
+        blocks.append(columns)
+    return header, blocks
+
+
+def read_audit(paths, model=None):
+    """Read audit files into ``{model: records}``.
+
+    ``paths`` are files or directories (every ``*.audit`` inside). Each
+    ``records`` dict has ``columns``, ``timestamp`` (datetime64[ns]),
+    ``checksum`` (hex string per record), ``inputs``, ``label`` and ``proba``,
+    sorted by time. A cut-off last block (a crash mid-write) is skipped with
+    a warning; any other damaged block raises ``ValueError``.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, f"{model or '*'}.*.audit")))
+        else:
+            files.append(path)
+
+    parts = {}
+    for path in files:
+        header, blocks = _read_file(path)
+        if model is not None and header["model"] != model:
+            continue
+        known = parts.setdefault(header["model"], {"columns": header["columns"], "blocks": []})
+        if known["columns"] != header["columns"]:
+            raise ValueError(f"{path}: columns differ from other '{header['model']}' logs")
+        known["blocks"] += blocks
+
+    results = {}
+    for name, part in sorted(parts.items()):
+        blocks = part["blocks"]
+        if not blocks:
+            continue
+        timestamp = np.concatenate([b["timestamp"] for b in blocks])
+        order = np.argsort(timestamp, kind="stable")
+        records = {"columns": part["columns"], "timestamp": timestamp[order].view("datetime64[ns]")}
+        records["checksum"] = np.repeat([b["checksum"] for b in blocks],
+                                        [len(b["timestamp"]) for b in blocks])[order]
+        for column in ("inputs", "label", "proba"):
+            records[column] = np.concatenate([b[column] for b in blocks])[order]
+        results[name] = records
+    return results
+
+
+def to_frame(records):
+    """Return one model's records as a DataFrame, one column per input and class."""
+    import pandas as pd
+
+    frame = pd.DataFrame(records["inputs"], columns=records["columns"])
+    frame.insert(0, "timestamp", records["timestamp"])
+    frame.insert(1, "checksum", records["checksum"])
+    frame["label"] = records["label"]
+    for k in range(records["proba"].shape[1]):
+        frame[f"proba_{k}"] = records["proba"][:, k]
+    return frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise or export prediction audit logs")
+    parser.add_argument("paths", nargs="*", help=f"files or directories (default: {config.AUDIT_DIR})")
+    parser.add_argument("--model", help="only this model's logs")
+    parser.add_argument("--csv", help="write the records to this CSV (requires --model)")
+    args = parser.parse_args(argv)
+    if args.csv and not args.model:
+        parser.error("--csv needs --model: each model has its own columns")
+
+    start = time.perf_counter()
+    results = read_audit(args.paths or [config.AUDIT_DIR], args.model)
+    elapsed = time.perf_counter() - start
+    total = sum(len(records["label"]) for records in results.values())
+    for name, records in results.items():
+        print(f"{name}: {len(records['label']):,} predictions, "
+              f"{records['timestamp'][0]} .. {records['timestamp'][-1]}")
+        checksums, counts = np.unique(records["checksum"], return_counts=True)
+        for checksum, count in zip(checksums, counts):
+            print(f"    model {checksum[:12]}  {count:,} predictions")
+    print(f"Scanned {total:,} records in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+    if args.csv:
+        if args.model not in results:
+            parser.error(f"no audit records for '{args.model}'")
+        to_frame(results[args.model]).to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Headless batch scoring for the shipped models.
+
+Reads a CSV (or stdin) in fixed-size chunks, builds each chunk's feature
+matrix in the column order the apps use and scores it with a single
+``predict_proba`` call, so memory stays bounded by the chunk size.
+
+    python batch_score.py heart patients.csv -o predictions.csv
+    cat wines.csv | python batch_score.py wine - --id-column sample_id > out.csv
+"""
+
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from features import MODELS, get_spec
+from scoring import model_input, predict_with_proba
+
+
+def score_frame(spec, model, chunk):
+    """Return a DataFrame of predictions (and probabilities) for ``chunk``."""
+    X = spec.schema.fill(chunk)
+    labels, proba = predict_with_proba(model, model_input(model, X))
+    result = pd.DataFrame({"prediction": labels}, index=chunk.index)
+    if proba is not None:
+        for i, label in enumerate(model.classes_):
+            result[f"proba_{label}"] = proba[:, i]
+    return result
+
+
+def score_csv(spec, source, output, chunk_size=50_000, id_column=None):
+    """Stream ``source`` through the model and write results to ``output``.
+
+    Returns the number of rows scored.
+    """
+    model = spec.load()
+    usecols = list(spec.columns)
+    if id_column is not None:
+        usecols.append(id_column)
+
+    rows = 0
+    reader = pd.read_csv(source, usecols=usecols, chunksize=chunk_size)
+    for chunk in reader:
+        result = score_frame(spec, model, chunk)
+        if id_column is not None:
+            result.insert(0, id_column, chunk[id_column])
+        result.to_csv(output, header=rows == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model", choices=sorted(MODELS))
+    parser.add_argument("input", help="CSV file to score, or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output CSV (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--id-column", help="input column copied to the output")
+    args = parser.parse_args(argv)
+
+    spec = get_spec(args.model)
+    source = sys.stdin if args.input == "-" else args.input
+    start = time.perf_counter()
+    try:
+        if args.output == "-":
+            rows = score_csv(spec, source, sys.stdout, args.chunk_size, args.id_column)
+        else:
+            with open(args.output, "w", newline="") as output:
+                rows = score_csv(spec, source, output, args.chunk_size, args.id_column)
+    # A missing artifact or input file; ValueError covers rows that fail validation
+    except (FileNotFoundError, ValueError) as e:
+        message = f"{e.filename} not found" if isinstance(e, FileNotFoundError) else e
+        print(f"{parser.prog}: error: {message}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
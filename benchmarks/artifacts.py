@@ -0,0 +1,293 @@
+"""Regression benchmark for every shipped model artifact.
+
+Each artifact is measured in a fresh interpreter so load time and resident
+memory are not skewed by earlier loads:
+
+    load_seconds         fastest of repeated ``joblib.load`` calls
+    rss_delta_bytes      resident memory added by the first load
+    latency_p50/p95_ms   one-row calls, as the apps make them
+    rows_per_s[<size>]   best batch throughput at several batch sizes
+
+``first_load_seconds`` (includes importing the estimator's modules) and
+``latency_p95_ms`` are recorded but too noisy to gate on.
+
+Inputs are synthetic rows in each app's column order, drawn from the range
+the artifact actually splits or scales on. Results are written as JSON;
+``--compare`` diffs two result files and exits non-zero when any metric got
+worse by more than ``--threshold``.
+
+    python -m benchmarks.artifacts -o bench.json
+    python -m benchmarks.artifacts --compare baseline.json bench.json --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from features import MODELS
+from model_registry import file_checksum
+from scoring import model_input, predict_with_proba
+
+BATCH_SIZES = (1, 16, 256, 4096)
+
+# name -> (path, kind, column source)
+ARTIFACTS = {
+    "heart": ("heart_disease_model.pkl", "model", "heart"),
+    "diabetes": ("trained_model.pkl", "model", "diabetes"),
+    "wine": ("wine_quality_model.pkl", "model", "wine"),
+    "rainfall": ("rainfall_prediction_model.pkl", "model", "rainfall"),
+    "breast": ("Breast_model.pkl", "model", "breast"),
+    "churn_encoders": ("encoder.pkl", "encoders", None),
+    "parkinsons": ("parkinsons_model.sav", "model", "parkinsons"),
+    "parkinsons_scaler": ("new_parkinsons_scaler.sav", "scaler", "parkinsons"),
+}
+
+# Metrics checked by --compare; lower is better except for throughput
+GATED = ("load_seconds", "rss_delta_bytes", "latency_p50_ms", "rows_per_s")
+HIGHER_IS_BETTER = ("rows_per_s",)
+
+# Absolute changes below these are timer/allocator noise, whatever the ratio
+NOISE_FLOOR = {"load_seconds": 0.002, "rss_delta_bytes": 1 << 20, "latency_p50_ms": 0.5}
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def feature_ranges(obj, n_features):
+    """Return ``(low, high)`` per feature for synthetic inputs."""
+    low, high = np.full(n_features, -2.0), np.full(n_features, 2.0)
+    if hasattr(obj, "estimators_"):
+        for feature in range(n_features):
+            thresholds = np.concatenate([
+                e.tree_.threshold[e.tree_.feature == feature] for e in obj.estimators_])
+            if len(thresholds):
+                span = thresholds.max() - thresholds.min()
+                low[feature] = thresholds.min() - 0.1 * span
+                high[feature] = thresholds.max() + 0.1 * span
+    elif hasattr(obj, "mean_"):
+        low, high = obj.mean_ - 2 * obj.scale_, obj.mean_ + 2 * obj.scale_
+    return low, high
+
+
+def make_workload(name, obj, rows, rng):
+    """Return ``(fn, batch)`` where ``fn(batch[:n])`` scores ``n`` rows."""
+    _, kind, columns_from = ARTIFACTS[name]
+    if kind == "encoders":
+        batch = pd.DataFrame({column: rng.choice(encoder.classes_, rows)
+                              for column, encoder in obj.items()})
+
+        def fn(frame):
+            return [encoder.transform(frame[column]) for column, encoder in obj.items()]
+        return fn, batch
+
+    n_features = obj.n_features_in_
+    columns = MODELS[columns_from].columns if columns_from else None
+    if columns is not None and len(columns) != n_features:
+        raise ValueError(f"{name}: app schema has {len(columns)} columns, "
+                         f"artifact expects {n_features}")
+    low, high = feature_ranges(obj, n_features)
+    X = rng.uniform(low, high, size=(rows, n_features))
+    names = getattr(obj, "feature_names_in_", None)
+    batch = pd.DataFrame(X, columns=names if names is not None else columns)
+
+    if kind == "scaler":
+        return (lambda frame: obj.transform(model_input(obj, frame))), batch
+    return (lambda frame: predict_with_proba(obj, model_input(obj, frame))), batch
+
+
+def best_rate(fn, chunk, budget=0.3, rounds=3):
+    """Return the best rows/s over ``rounds`` timed loops of ``budget / rounds`` seconds."""
+    best = 0.0
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            fn(chunk)
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= budget / rounds:
+                break
+        best = max(best, calls * len(chunk) / elapsed)
+    return best
+
+
+def measure(name, load_repeat=10, latency_repeat=200, seed=0):
+    """Benchmark one artifact in the current process."""
+    path = ARTIFACTS[name][0]
+    import joblib
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        before = rss_bytes()
+        start = time.perf_counter()
+        obj = joblib.load(path)
+        first_load = time.perf_counter() - start
+        rss_delta = rss_bytes() - before
+
+        loads = []
+        for _ in range(load_repeat):
+            start = time.perf_counter()
+            joblib.load(path)
+            loads.append(time.perf_counter() - start)
+
+        fn, batch = make_workload(name, obj, max(BATCH_SIZES), np.random.default_rng(seed))
+        row = batch.iloc[:1]
+        fn(row)
+        latencies = []
+        for _ in range(latency_repeat):
+            start = time.perf_counter()
+            fn(row)
+            latencies.append(time.perf_counter() - start)
+
+        throughput = {str(size): best_rate(fn, batch.iloc[:size]) for size in BATCH_SIZES}
+
+    p50, p95 = np.percentile(latencies, (50, 95)) * 1000
+    return {
+        "path": path,
+        "checksum": file_checksum(path),
+        "size_bytes": os.path.getsize(path),
+        "first_load_seconds": first_load,
+        "load_seconds": min(loads),
+        "rss_delta_bytes": rss_delta,
+        "latency_p50_ms": float(p50),
+        "latency_p95_ms": float(p95),
+        "rows_per_s": throughput,
+    }
+
+
+def run_all(names):
+    """Measure every artifact in its own interpreter."""
+    results = {}
+    for name in names:
+        if not os.path.exists(ARTIFACTS[name][0]):
+            print(f"{name}: {ARTIFACTS[name][0]} not found, skipped", file=sys.stderr)
+            continue
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.artifacts", "--worker", name],
+                              capture_output=True, text=True, check=True)
+        results[name] = json.loads(proc.stdout)
+        print(f"{name:18s} load {results[name]['load_seconds'] * 1000:7.1f} ms  "
+              f"p50 {results[name]['latency_p50_ms']:7.3f} ms  "
+              f"{results[name]['rows_per_s'][str(BATCH_SIZES[-1])]:12,.0f} rows/s",
+              file=sys.stderr)
+    import sklearn
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "artifacts": results,
+    }
+
+
+def flatten(result):
+    """Return ``{metric: value}`` with nested throughput keys flattened."""
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update({f"{key}[{size}]": v for size, v in value.items()})
+        elif isinstance(value, (int, float)) and key not in ("size_bytes",):
+            flat[key] = value
+    return flat
+
+
+def compare(baseline, current, threshold=0.25):
+    """Return ``(rows, regressions)`` comparing two result documents.
+
+    A gated metric regresses when it is more than ``threshold`` (a
+    fraction) worse than the baseline and the change exceeds its noise floor.
+    """
+    rows, regressions = [], []
+    for name, old in baseline["artifacts"].items():
+        new = current["artifacts"].get(name)
+        if new is None:
+            regressions.append((name, "missing", None, None, None))
+            continue
+        old_flat, new_flat = flatten(old), flatten(new)
+        for metric, before in old_flat.items():
+            after = new_flat.get(metric)
+            if after is None or before == 0:
+                continue
+            change = (after - before) / abs(before)
+            worse = -change if metric.startswith(HIGHER_IS_BETTER) else change
+            row = (name, metric, before, after, change)
+            rows.append(row)
+            significant = abs(after - before) > NOISE_FLOOR.get(metric, 0)
+            if metric.startswith(GATED) and worse > threshold and significant:
+                regressions.append(row)
+        if old["checksum"] != new["checksum"]:
+            rows.append((name, "checksum changed", None, None, None))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every shipped model artifact")
+    parser.add_argument("artifacts", nargs="*", help=f"default: all of {', '.join(ARTIFACTS)}")
+    parser.add_argument("-o", "--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown before a metric fails (default 0.25)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(measure(args.worker), sys.stdout)
+        return 0
+
+    if args.compare:
+        with open(args.compare[0]) as file:
+            baseline = json.load(file)
+        with open(args.compare[1]) as file:
+            current = json.load(file)
+        rows, regressions = compare(baseline, current, args.threshold)
+        for name, metric, before, after, change in rows:
+            if change is None:
+                print(f"{name:18s} {metric}")
+            else:
+                if (name, metric, before, after, change) in regressions:
+                    flag = "FAIL"
+                else:
+                    flag = "ok" if metric.startswith(GATED) else "-"
+                print(f"{name:18s} {metric:22s} {before:14.6g} -> {after:14.6g} "
+                      f"{change:+8.1%}  {flag}")
+        for name, metric, *_ in regressions:
+            if metric == "missing":
+                print(f"{name:18s} missing from {args.compare[1]}  FAIL")
+        print("PASS" if not regressions else f"FAIL: {len(regressions)} regression(s)")
+        return 1 if regressions else 0
+
+    unknown = set(args.artifacts) - set(ARTIFACTS)
+    if unknown:
+        parser.error(f"unknown artifacts: {', '.join(sorted(unknown))}")
+    results = run_all(args.artifacts or list(ARTIFACTS))
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Compiled flat-array forest vs. sklearn ``predict_proba``.
+
+Rows are sampled uniformly over each feature's split-threshold range so
+every branch is exercised; probabilities must match bit for bit.
+
+    python -m benchmarks.forest_inference --rows 10000
+"""
+
+import argparse
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from forest_compiler import compile_forest
+
+MODELS = ["wine_quality_model.pkl", "rainfall_prediction_model.pkl"]
+
+
+def sample_rows(model, count, rng):
+    low = np.zeros(model.n_features_in_)
+    high = np.ones(model.n_features_in_)
+    for feature in range(model.n_features_in_):
+        thresholds = np.concatenate([
+            e.tree_.threshold[e.tree_.feature == feature] for e in model.estimators_])
+        if len(thresholds):
+            span = thresholds.max() - thresholds.min()
+            low[feature] = thresholds.min() - 0.1 * span
+            high[feature] = thresholds.max() + 0.1 * span
+    X = rng.uniform(low, high, size=(count, model.n_features_in_))
+    names = getattr(model, "feature_names_in_", None)
+    return X if names is None else pd.DataFrame(X, columns=names)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("models", nargs="*", default=MODELS)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200, help="single-row repetitions")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    for path in args.models:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = joblib.load(path)
+
+        start = time.perf_counter()
+        compiled = compile_forest(model)
+        compile_seconds = time.perf_counter() - start
+
+        X = sample_rows(model, args.rows, rng)
+        identical = np.array_equal(model.predict_proba(X), compiled.predict_proba(X))
+        row = X[:1]
+
+        sk_row = best_of(lambda: model.predict_proba(row), args.repeat)
+        fl_row = best_of(lambda: compiled.predict_proba(row), args.repeat)
+        sk_batch = best_of(lambda: model.predict_proba(X), 5)
+        fl_batch = best_of(lambda: compiled.predict_proba(X), 5)
+
+        print(f"{path}: {compiled.n_estimators} trees, {compiled.n_nodes:,} nodes "
+              f"(compiled in {compile_seconds * 1000:.1f} ms)")
+        print(f"  bit-identical on {args.rows:,} rows : {identical}")
+        print(f"  1 row    sklearn {sk_row * 1000:8.3f} ms   compiled {fl_row * 1000:8.3f} ms "
+              f"({sk_row / fl_row:5.1f}x)")
+        print(f"  {args.rows:,} rows sklearn {sk_batch * 1000:8.1f} ms   compiled {fl_batch * 1000:8.1f} ms "
+              f"({sk_batch / fl_batch:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Resident memory of the multipage host vs. one process per app.
+
+Each measurement runs in a fresh interpreter that executes the scripts with
+Streamlit's ``AppTest`` harness (no browser or server needed):
+
+    separate  one interpreter per app, running just that script
+    host      one interpreter running app.py and visiting every page
+
+The separate total is the sum of the per-app resident sizes, i.e. what
+eight ``streamlit run`` processes hold between them. Pages that fail (a
+missing artifact or data file) are reported and still counted, in both
+modes, as they are in production.
+
+    python -m benchmarks.host_memory
+    python -m benchmarks.host_memory Heart.py wine.py -o memory.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import warnings
+
+HOST = "app.py"
+APPS = ["Heart.py", "diabetes.py", "breast.py", "parkinsons.py", "wine.py",
+        "RNP.py", "churn.py", "movies.py", "cgpa.py"]
+
+
+def rss_bytes():
+    # Same measure as benchmarks.artifacts, which is not imported here
+    # because it pulls in pandas and would inflate every process alike
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def run_pages(pages, host):
+    """Run ``pages`` in this process and return ``{rss_bytes, failed}``."""
+    from streamlit.testing.v1 import AppTest
+
+    failed = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if host:
+            app = AppTest.from_file(os.path.abspath(HOST), default_timeout=300).run()
+            for page in pages:
+                if app.switch_page(page).run().exception:
+                    failed.append(page)
+        else:
+            for page in pages:
+                if AppTest.from_file(os.path.abspath(page), default_timeout=300).run().exception:
+                    failed.append(page)
+    return {"rss_bytes": rss_bytes(), "failed": failed}
+
+
+def measure(pages, host):
+    """Run ``pages`` in a fresh interpreter and return its result."""
+    command = [sys.executable, "-m", "benchmarks.host_memory", "--worker", *pages]
+    if host:
+        command.append("--host")
+    proc = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare host vs per-app process memory")
+    parser.add_argument("apps", nargs="*", help=f"default: {' '.join(APPS)}")
+    parser.add_argument("-o", "--output", help="also write the results as JSON")
+    parser.add_argument("--worker", nargs="+", help=argparse.SUPPRESS)
+    parser.add_argument("--host", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_pages(args.worker, args.host)))
+        return 0
+
+    apps = args.apps or APPS
+    separate = {}
+    for page in apps:
+        separate[page] = measure([page], host=False)
+        note = "  (page failed)" if separate[page]["failed"] else ""
+        print(f"{page:16s} {separate[page]['rss_bytes'] / 2**20:8.1f} MiB{note}")
+    total = sum(result["rss_bytes"] for result in separate.values())
+    host = measure(apps, host=True)
+
+    print(f"{len(apps)} processes    {total / 2**20:8.1f} MiB")
+    print(f"{HOST} (1 process) {host['rss_bytes'] / 2**20:8.1f} MiB  "
+          f"({1 - host['rss_bytes'] / total:.0%} less)")
+    if host["failed"]:
+        print(f"pages that failed in both modes: {', '.join(host['failed'])}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"separate": separate, "separate_total_bytes": total, "host": host},
+                      file, indent=2, sort_keys=True)
+            file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
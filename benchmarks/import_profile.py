@@ -0,0 +1,72 @@
+"""Import-time profile of each Streamlit app.
+
+Every app's top-level imports are run in a fresh interpreter under
+``python -X importtime``. The report gives the total import time and the
+heaviest top-level packages by cumulative time, and flags the heavy
+libraries (pandas, scipy, sklearn, pyarrow) that got pulled in. Imports
+deferred into functions don't show up, which is the point: they are paid
+only by the code paths that need them.
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile Heart.py wine.py --top 5 -o imports.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from launcher import APPS, app_imports
+
+HEAVY = ("pandas", "scipy", "sklearn", "pyarrow")
+
+
+def profile(path):
+    """Return ``(packages, modules)`` for the top-level imports of ``path``.
+
+    ``packages`` maps each outermost import to its cumulative seconds;
+    ``modules`` is every module imported along the way.
+    """
+    code = "\n".join(app_imports(path))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, check=True)
+    packages, modules = {}, set()
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        # Nested imports are indented; only count the outermost ones
+        if not name.startswith("  "):
+            packages[name.strip()] = int(cumulative) / 1e6
+    return packages, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the import time of each app")
+    parser.add_argument("apps", nargs="*", help=f"default: {' '.join(APPS)}")
+    parser.add_argument("--top", type=int, default=3, help="packages listed per app (default 3)")
+    parser.add_argument("-o", "--output", help="also write the full profile as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for path in args.apps or APPS:
+        packages, modules = profile(path)
+        heavy = [name for name in HEAVY if name in modules]
+        results[path] = {"seconds": sum(packages.values()), "packages": packages, "heavy": heavy}
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        heavy = heavy or ["none"]
+        print(f"{path:16s} {sum(packages.values()) * 1000:8.1f} ms  heavy: {', '.join(heavy)}")
+        for name, seconds in heaviest:
+            print(f"    {name:30s} {seconds * 1000:8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Trigram title index vs. the difflib scan in movies.py.
+
+    python -m benchmarks.title_lookup --titles 200000 --queries 200
+"""
+
+import argparse
+import difflib
+import time
+
+import numpy as np
+import pandas as pd
+
+from title_index import TitleIndex
+
+WORDS = ["star", "dark", "night", "love", "war", "blue", "king", "lost", "city", "dream",
+         "iron", "last", "empire", "return", "shadow", "river", "ghost", "house", "man",
+         "story", "rise", "fall", "world", "secret", "golden", "silent", "wild", "heart"]
+
+
+def synthetic_titles(count, rng):
+    words = np.array(WORDS)
+    titles = set()
+    while len(titles) < count:
+        size = rng.integers(1, 5)
+        titles.add(" ".join(rng.choice(words, size)).title() + f" {rng.integers(1, 10_000)}")
+    return sorted(titles)
+
+
+def add_typo(title, rng):
+    chars = list(title)
+    i = rng.integers(len(chars))
+    op = rng.integers(3)
+    if op == 0:
+        del chars[i]
+    elif op == 1:
+        chars.insert(i, chars[i])
+    else:
+        chars[i] = "x"
+    return "".join(chars)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    titles = synthetic_titles(args.titles, rng)
+    movies_data = pd.DataFrame({"title": titles})
+    queries = [add_typo(titles[i], rng) for i in rng.integers(len(titles), size=args.queries)]
+
+    start = time.perf_counter()
+    index = TitleIndex(titles)
+    build = time.perf_counter() - start
+
+    # Current movies.py path: difflib over every title, then a column scan
+    start = time.perf_counter()
+    baseline = []
+    for query in queries:
+        matches = difflib.get_close_matches(query, titles)
+        row = movies_data[movies_data.title == matches[0]].index[0] if matches else None
+        baseline.append(row)
+    difflib_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = []
+    for query in queries:
+        matches = index.lookup(query)
+        indexed.append(index.row_of[matches[0]] if matches else None)
+    index_seconds = time.perf_counter() - start
+
+    agree = sum(a == b for a, b in zip(baseline, indexed))
+    print(f"{args.titles:,} titles, {args.queries} typo queries (index built in {build:.2f}s)")
+    print(f"difflib + column scan : {difflib_seconds / args.queries * 1000:9.2f} ms/query")
+    print(f"trigram index         : {index_seconds / args.queries * 1000:9.2f} ms/query "
+          f"({difflib_seconds / index_seconds:,.0f}x faster)")
+    print(f"same row as difflib   : {agree}/{args.queries}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,8 @@
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-import joblib
+from features import MODELS
+from prediction_cache import get_cache
+from audit_log import AuditError, get_audit_log
+from metrics import StageTimer, write_prometheus
 import streamlit as st 
-from sklearn.ensemble import RandomForestClassifier
 
 # Page config
 st.set_page_config(page_title="Breast Cancer Disease Prediction", layout="centered", page_icon="🎀💗")
@@ -18,9 +16,11 @@ st.sidebar.info("👉 Fill in the details on the main screen and click **Predict
 st.markdown("<h1 style='text-align: center; color: pink;'>🎀🎗️ Breast Cancer Disease Prediction App</h1>", unsafe_allow_html=True)
 
 # Load the model
+stages = StageTimer("breast")
 try:
-    with open("Breast_model.pkl", "rb") as vishal:
-        model = joblib.load(vishal)
+    spec = MODELS["breast"]
+    entry = spec.entry()
+    stages.lap("load")
     st.sidebar.success("✅ Model loaded successfully!")
 except FileNotFoundError:
     st.sidebar.error("❌ Model file not found!")
@@ -71,18 +71,37 @@ with col3:
 
 # Predict button
 if st.button("🔍 Predict Breast Cancer Disease"):
-    input_data = np.array([[mean_radius, mean_texture, mean_perimeter, mean_area,
-                            mean_smoothness, mean_compactness, mean_concavity,
-                            mean_concave_points, mean_symmetry, mean_fractal_dimension,
-                            radius_error, texture_error, perimeter_error, area_error,
-                            smoothness_error, compactness_error, concavity_error,
-                            concave_points_error, symmetry_error, fractal_dimension_error,
-                            worst_radius, worst_texture, worst_perimeter, worst_area,
-                            worst_smoothness, worst_compactness, worst_concavity,
-                            worst_concave_points, worst_symmetry, worst_fractal_dimension]])
-
-    prediction = model.predict(input_data)
-    prediction_proba = model.predict_proba(input_data)[0]
+    stages.restart()
+    input_data = spec.schema.fill_row({
+        "mean radius": mean_radius, "mean texture": mean_texture,
+        "mean perimeter": mean_perimeter, "mean area": mean_area,
+        "mean smoothness": mean_smoothness, "mean compactness": mean_compactness,
+        "mean concavity": mean_concavity, "mean concave points": mean_concave_points,
+        "mean symmetry": mean_symmetry, "mean fractal dimension": mean_fractal_dimension,
+        "radius error": radius_error, "texture error": texture_error,
+        "perimeter error": perimeter_error, "area error": area_error,
+        "smoothness error": smoothness_error, "compactness error": compactness_error,
+        "concavity error": concavity_error, "concave points error": concave_points_error,
+        "symmetry error": symmetry_error, "fractal dimension error": fractal_dimension_error,
+        "worst radius": worst_radius, "worst texture": worst_texture,
+        "worst perimeter": worst_perimeter, "worst area": worst_area,
+        "worst smoothness": worst_smoothness, "worst compactness": worst_compactness,
+        "worst concavity": worst_concavity, "worst concave points": worst_concave_points,
+        "worst symmetry": worst_symmetry, "worst fractal dimension": worst_fractal_dimension,
+    })
+    stages.lap("input")
+
+    prediction, prediction_proba = get_cache("breast").predict(entry, input_data)
+    prediction_proba = prediction_proba[0]
+    stages.lap("predict")
+
+    # Queued for the audit log; written by a background thread
+    try:
+        get_audit_log("breast", spec.columns).record(entry.checksum, input_data, prediction, prediction_proba)
+    except AuditError as e:
+        st.error(f"❌ Prediction not shown: it could not be recorded in the audit log ({e})")
+        st.stop()
+    stages.lap("audit")
 
     st.markdown("---")
     st.markdown("<h2 style='text-align: center;'>🎀 Breast Cancer Disease Prediction</h2>", unsafe_allow_html=True)
@@ -103,6 +122,8 @@ if st.button("🔍 Predict Breast Cancer Disease"):
     <span style='color: green;'> ✅ Healthy Breast (Benign) , Enjoy Your Life: {prediction_proba[0]*100:.2f}%</span>
     </h4>
     """, unsafe_allow_html=True)
+    stages.lap("render")
+    write_prometheus()
 
 # Sidebar footer
 st.sidebar.markdown("---") 
@@ -0,0 +1,115 @@
+"""Label encoding compiled to NumPy lookup tables.
+
+encoder.pkl holds the ``LabelEncoder`` fitted on every categorical churn
+column at training time. ``CategoryEncoder`` turns each one into a sorted
+label array plus a hash index, so a whole column of a batch is encoded with
+a few vectorized operations, and assembles the model's input as one contiguous
+float matrix in ``feature_names_in_`` order. Codes come from the saved
+encoders, never from a hand-written mapping, and are checked against
+``LabelEncoder.transform`` when the tables are built.
+
+    encoder = load_model("encoder.pkl", loader=load_encoder)
+    X = encoder.transform(frame, feature_names)
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+class CategoryEncoder:
+    """Per-column label -> code lookup tables."""
+
+    def __init__(self, categories):
+        self.categories = {column: np.asarray(labels, dtype=object)
+                           for column, labels in categories.items()}
+        self._index = {column: pd.Index(labels) for column, labels in self.categories.items()}
+        # Plain dicts are faster than any array op for a single value
+        self._codes = {column: {label: code for code, label in enumerate(labels)}
+                       for column, labels in self.categories.items()}
+
+    @classmethod
+    def from_label_encoders(cls, encoders):
+        """Build the tables from a ``{column: LabelEncoder}`` dict and validate them."""
+        encoder = cls({column: label_encoder.classes_
+                       for column, label_encoder in encoders.items()})
+        encoder.validate(encoders)
+        return encoder
+
+    def validate(self, encoders):
+        """Raise ``ValueError`` unless every table reproduces ``encoders`` exactly."""
+        if set(encoders) != set(self.categories):
+            raise ValueError(f"encoded columns differ: saved {sorted(encoders)}, "
+                             f"tables {sorted(self.categories)}")
+        for column, label_encoder in encoders.items():
+            labels = label_encoder.classes_
+            if not np.array_equal(self.encode(column, labels), label_encoder.transform(labels)):
+                raise ValueError(f"'{column}': lookup table disagrees with the saved encoder")
+
+    def encode(self, column, values, strict=True):
+        """Return the codes of ``values`` for one column.
+
+        Unknown labels raise ``ValueError``, or become NaN (in a float
+        array) with ``strict=False``. Numeric input is taken as codes that
+        are already encoded and only range-checked.
+        """
+        values = np.asarray(values)
+        if values.dtype.kind in "iuf":
+            codes = values.astype(np.float64)
+            invalid = (codes < 0) | (codes >= len(self.categories[column])) | (codes != np.round(codes))
+        else:
+            # Hash the batch down to its distinct labels, look those up once,
+            # then gather; missing values (-1 from factorize) hit the -1 slot
+            inverse, uniques = pd.factorize(values)
+            table = np.append(self._index[column].get_indexer(uniques), -1)
+            codes = table[inverse]
+            invalid = codes < 0
+        if invalid.any():
+            if strict:
+                unknown = pd.unique(values[invalid])[:5].tolist()
+                raise ValueError(f"'{column}': unknown categories {unknown}, "
+                                 f"expected one of {self.categories[column].tolist()}")
+            codes = codes.astype(np.float64)
+            codes[invalid] = np.nan
+            return codes
+        return codes.astype(np.int64)
+
+    def transform(self, data, columns):
+        """Return ``data`` as a C-contiguous float64 matrix in ``columns`` order.
+
+        ``data`` is a DataFrame or a ``{column: values}`` mapping; columns
+        without a lookup table must already be numeric.
+        """
+        missing = [column for column in columns if column not in data]
+        if missing:
+            raise ValueError(f"missing columns {missing}")
+        n = len(data[columns[0]]) if columns else 0
+        X = np.empty((n, len(columns)), dtype=np.float64)
+        for j, column in enumerate(columns):
+            if column in self._index:
+                X[:, j] = self.encode(column, data[column])
+            else:
+                X[:, j] = np.asarray(data[column], dtype=np.float64)
+        return X
+
+    def transform_row(self, row, columns):
+        """Return one ``{column: value}`` dict as a (1, n_features) matrix."""
+        missing = [column for column in columns if column not in row]
+        if missing:
+            raise ValueError(f"missing columns {missing}")
+        X = np.empty((1, len(columns)), dtype=np.float64)
+        for j, column in enumerate(columns):
+            value = row[column]
+            codes = self._codes.get(column)
+            if codes is None:
+                X[0, j] = value
+            elif isinstance(value, str) and value in codes:
+                X[0, j] = codes[value]
+            else:
+                X[0, j] = self.encode(column, [value])[0]
+        return X
+
+
+def load_encoder(path):
+    """Registry loader: compile a pickled ``{column: LabelEncoder}`` dict."""
+    return CategoryEncoder.from_label_encoders(joblib.load(path))
@@ -1,9 +1,11 @@
+import time
 import streamlit as st
+import numpy as np
 
 st.set_page_config(page_title="🎓 CGPA Calculator", layout="centered")
 
 st.title("🎓 Customizable CGPA Calculator")
-st.markdown("Easily calculate your CGPA by entering grades and credit hours. Fully customizable! ✨")
+st.markdown("Easily calculate your CGPA by entering grades and credit hours, or upload a whole class roster. Fully customizable! ✨")
 
 st.sidebar.header("🔧 Customize Grade Points")
 
@@ -25,58 +27,148 @@ for grade, point in default_grades.items():
 st.sidebar.markdown("---")
 st.sidebar.markdown("🧾 Customize grade point values as per your university")
 
-# Number of subjects
-st.markdown("### 📘 Add Subject Details")
-num_subjects = st.number_input("Enter number of subjects", min_value=1, max_value=50, step=1)
-
-grades = []
-credits = []
-
-with st.form("cgpa_form"):
-    for i in range(int(num_subjects)):
-        st.markdown(f"**Subject {i+1}**")
-        cols = st.columns([1.5, 1.5])
-        with cols[0]:
-            grade = st.selectbox(
-                f"Grade for Subject {i+1}",
-                options=list(custom_grade_points.keys()),
-                key=f"grade_{i}"
-            )
-        with cols[1]:
-            credit = st.number_input(
-                f"Credit for Subject {i+1}",
-                min_value=1, max_value=10,
-                key=f"credit_{i}"
+one, bulk = st.tabs(["🧮 One student", "📂 Class roster (CSV)"])
+
+with one:
+    # Number of subjects
+    st.markdown("### 📘 Add Subject Details")
+    num_subjects = st.number_input("Enter number of subjects", min_value=1, max_value=50, step=1)
+
+    grades = []
+    credits = []
+
+    with st.form("cgpa_form"):
+        for i in range(int(num_subjects)):
+            st.markdown(f"**Subject {i+1}**")
+            cols = st.columns([1.5, 1.5])
+            with cols[0]:
+                grade = st.selectbox(
+                    f"Grade for Subject {i+1}",
+                    options=list(custom_grade_points.keys()),
+                    key=f"grade_{i}"
+                )
+            with cols[1]:
+                credit = st.number_input(
+                    f"Credit for Subject {i+1}",
+                    min_value=1, max_value=10,
+                    key=f"credit_{i}"
+                )
+            grades.append(custom_grade_points[grade])
+            credits.append(credit)
+            st.markdown("---")
+
+        submitted = st.form_submit_button("📊 Calculate CGPA")
+
+    if submitted:
+        total_credits = sum(credits)
+        total_points = sum([g * c for g, c in zip(grades, credits)])
+
+        if total_credits == 0:
+            st.error("❌ Total credits cannot be zero.")
+        else:
+            cgpa = total_points / total_credits
+            st.success(f"🎯 Your CGPA is: **{cgpa:.2f}**")
+
+            # Show detailed breakdown
+            with st.expander("📋 Detailed Breakdown"):
+                for i in range(int(num_subjects)):
+                    st.write(f"Subject {i+1}: Grade Point = {grades[i]}, Credit = {credits[i]}, Weighted = {grades[i]*credits[i]}")
+                st.markdown(f"**Total Points** = {total_points}")
+                st.markdown(f"**Total Credits** = {total_credits}")
+
+            # Optional download as text file
+            st.download_button(
+                label="📤 Download Report",
+                data=f"CGPA Calculation Report\nCGPA: {cgpa:.2f}\nTotal Credits: {total_credits}\nTotal Points: {total_points}",
+                file_name="cgpa_report.txt",
+                mime="text/plain"
             )
-        grades.append(custom_grade_points[grade])
-        credits.append(credit)
-        st.markdown("---")
-
-    submitted = st.form_submit_button("📊 Calculate CGPA")
-
-if submitted:
-    total_credits = sum(credits)
-    total_points = sum([g * c for g, c in zip(grades, credits)])
-
-    if total_credits == 0:
-        st.error("❌ Total credits cannot be zero.")
-    else:
-        cgpa = total_points / total_credits
-        st.success(f"🎯 Your CGPA is: **{cgpa:.2f}**")
-
-        # Show detailed breakdown
-        with st.expander("📋 Detailed Breakdown"):
-            for i in range(int(num_subjects)):
-                st.write(f"Subject {i+1}: Grade Point = {grades[i]}, Credit = {credits[i]}, Weighted = {grades[i]*credits[i]}")
-            st.markdown(f"**Total Points** = {total_points}")
-            st.markdown(f"**Total Credits** = {total_credits}")
-
-        # Optional download as text file
+
+
+# Roster: a long-format CSV with one row per student and subject
+STUDENT, GRADE, CREDITS = "student_id", "grade", "credits"
+CHUNK_ROWS = 200_000
+
+
+def roster_cgpa(source, grade_points, chunk_rows=CHUNK_ROWS):
+    """Return ``(report, rows)``: credit-weighted CGPA per student in a grades CSV.
+
+    The file is read ``chunk_rows`` at a time. Each chunk's grades are looked
+    up in ``grade_points`` in one vectorized step and reduced to per-student
+    sums, which are added up at the end since a student's rows may span
+    chunks. Raises ``ValueError`` for missing columns or student ids, unknown
+    grades and credits that are not positive, finite numbers.
+    """
+    import pandas as pd
+
+    labels = pd.Index(list(grade_points))
+    points = np.array(list(grade_points.values()), dtype=np.float64)
+    partials = []
+    rows = 0
+    reader = pd.read_csv(source, usecols=[STUDENT, GRADE, CREDITS], chunksize=chunk_rows,
+                         dtype={STUDENT: str, GRADE: str})
+    for chunk in reader:
+        if chunk[STUDENT].isna().any():
+            raise ValueError(f"'{STUDENT}' is missing on {int(chunk[STUDENT].isna().sum())} row(s)")
+        codes = labels.get_indexer(chunk[GRADE].str.strip())
+        if (codes < 0).any():
+            bad = pd.unique(chunk[GRADE][codes < 0])[:5].tolist()
+            raise ValueError(f"unknown grades {bad}, expected one of {labels.tolist()}")
+        credits = pd.to_numeric(chunk[CREDITS], errors="coerce").to_numpy(dtype=np.float64)
+        invalid = ~(np.isfinite(credits) & (credits > 0))
+        if invalid.any():
+            bad = pd.unique(chunk[CREDITS][invalid])[:5].tolist()
+            raise ValueError(f"'{CREDITS}' must be positive, finite numbers, got {bad}")
+
+        partials.append(pd.DataFrame(
+            {"subjects": 1, "credits": credits, "points": points[codes] * credits},
+            index=chunk[STUDENT].to_numpy(),
+        ).groupby(level=0, sort=False).sum())
+        rows += len(chunk)
+
+    # A header-only file still yields one empty chunk
+    if rows == 0:
+        raise ValueError("the file has no grade rows")
+    report = pd.concat(partials).groupby(level=0).sum()
+    report["cgpa"] = (report["points"] / report["credits"]).round(2)
+    report.index.name = STUDENT
+    return report.reset_index(), rows
+
+
+# Bulk: the report is kept per upload and grade table, so reruns (e.g. the
+# download) don't recompute it. pandas is only imported once a file is uploaded.
+with bulk:
+    st.markdown(f"Upload one row per student and subject with the columns `{STUDENT}`, "
+                f"`{GRADE}` and `{CREDITS}`. Grades use the points set in the sidebar.")
+    uploaded = st.file_uploader("📂 Upload grades (CSV)", type="csv")
+    if uploaded is not None:
+        key = (uploaded.file_id, tuple(custom_grade_points.items()))
+        roster = st.session_state.get("cgpa_roster")
+        if roster is None or roster["key"] != key:
+            start = time.perf_counter()
+            uploaded.seek(0)
+            try:
+                report, rows = roster_cgpa(uploaded, custom_grade_points)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                st.stop()
+            roster = {"key": key, "report": report, "rows": rows,
+                      "seconds": time.perf_counter() - start}
+            st.session_state["cgpa_roster"] = roster
+
+        report = roster["report"]
+        c1, c2, c3 = st.columns(3)
+        c1.metric("🧑‍🎓 Students", f"{len(report):,}")
+        c2.metric("🧾 Grade rows", f"{roster['rows']:,}")
+        c3.metric("⏱️ Computed in", f"{roster['seconds'] * 1000:,.0f} ms")
+        st.bar_chart(report["cgpa"].round().value_counts().sort_index())
+        st.dataframe(report, use_container_width=True)
+        # The CSV is only generated when the button is clicked
         st.download_button(
-            label="📤 Download Report",
-            data=f"CGPA Calculation Report\nCGPA: {cgpa:.2f}\nTotal Credits: {total_credits}\nTotal Points: {total_points}",
-            file_name="cgpa_report.txt",
-            mime="text/plain"
+            label="📤 Download CGPA report",
+            data=lambda: report.to_csv(index=False),
+            file_name="cgpa_roster_report.csv",
+            mime="text/csv",
         )
 
 # Footer
@@ -1,10 +1,22 @@
 import streamlit as st
-import joblib
-import pandas as pd
+from model_registry import load_model
+from forest_compiler import load_compiled
+from category_encoder import load_encoder
+from features import CHURN_COLUMNS, CHURN_ENCODER_PATH
+from scoring import model_input, predict_with_proba
+from metrics import StageTimer, write_prometheus
 
-# Load the model
-loaded = joblib.load("churn_model.pkl")
+# Load the model (cached across reruns)
+stages = StageTimer("churn")
+loaded = load_model("churn_model.pkl", loader=load_compiled)
 model = loaded['model'] if isinstance(loaded, dict) and 'model' in loaded else loaded
+# LabelEncoders saved at training time, compiled to lookup tables
+encoder = load_model(CHURN_ENCODER_PATH, loader=load_encoder)
+feature_names = getattr(model, "feature_names_in_", None)
+if feature_names is None and isinstance(loaded, dict):
+    feature_names = loaded.get("features_names")
+feature_names = list(CHURN_COLUMNS if feature_names is None else feature_names)
+stages.lap("load")
 
 # Page configuration
 st.set_page_config(page_title="📉 Churn Predictor", layout="centered")
@@ -35,32 +47,9 @@ PaymentMethod = st.sidebar.selectbox("💳 Payment Method", [
 MonthlyCharges = st.sidebar.number_input("💸 Monthly Charges", min_value=0.0)
 TotalCharges = st.sidebar.number_input("💰 Total Charges", min_value=0.0)
 
-# Mapping for encoding
-mapping = {
-    'gender': {'Male': 0, 'Female': 1},
-    'Partner': {'Yes': 1, 'No': 0},
-    'Dependents': {'Yes': 1, 'No': 0},
-    'PhoneService': {'Yes': 1, 'No': 0},
-    'MultipleLines': {'No phone service': 0, 'No': 1, 'Yes': 2},
-    'InternetService': {'No': 0, 'DSL': 1, 'Fiber optic': 2},
-    'OnlineSecurity': {'No': 0, 'Yes': 1, 'No internet service': 2},
-    'OnlineBackup': {'No': 0, 'Yes': 1, 'No internet service': 2},
-    'DeviceProtection': {'No': 0, 'Yes': 1, 'No internet service': 2},
-    'TechSupport': {'No': 0, 'Yes': 1, 'No internet service': 2},
-    'StreamingTV': {'No': 0, 'Yes': 1, 'No internet service': 2},
-    'StreamingMovies': {'No': 0, 'Yes': 1, 'No internet service': 2},
-    'Contract': {'Month-to-month': 0, 'One year': 1, 'Two year': 2},
-    'PaperlessBilling': {'Yes': 1, 'No': 0},
-    'PaymentMethod': {
-        'Electronic check': 0,
-        'Mailed check': 1,
-        'Bank transfer (automatic)': 2,
-        'Credit card (automatic)': 3
-    }
-}
-
 # Predict button
 if st.button("🔮 Predict Now!"):
+    stages.restart()
     input_data = {
         'gender': gender,
         'SeniorCitizen': SeniorCitizen,
@@ -83,15 +72,14 @@ if st.button("🔮 Predict Now!"):
         'TotalCharges': TotalCharges
     }
 
-    # Apply encoding
-    for key in mapping:
-        input_data[key] = mapping[key][input_data[key]]
-
-    input_df = pd.DataFrame([input_data])
-
     try:
-        prediction = model.predict(input_df)[0]
-        prob = model.predict_proba(input_df)[0][1] * 100
+        # One float row in the model's feature order
+        X = encoder.transform_row(input_data, feature_names)
+        stages.lap("input")
+        labels, proba = predict_with_proba(model, model_input(model, X))
+        prediction = labels[0]
+        prob = proba[0][1] * 100
+        stages.lap("predict")
 
         st.markdown("## 🧠 Prediction Result")
         if prediction == 1:
@@ -99,5 +87,7 @@ if st.button("🔮 Predict Now!"):
         else:
             st.success(f"✅ The customer is likely to **STAY**.")
         st.info(f"📈 Churn Probability: **{prob:.2f}%**")
+        stages.lap("render")
+        write_prometheus()
     except Exception as e:
         st.error(f"❌ Prediction failed: {e}")
@@ -0,0 +1,43 @@
+"""Paths shared by the apps and tools.
+
+Every setting can be overridden with an environment variable so nothing
+depends on a particular machine's drive layout, e.g.::
+
+    PREDICTIO_MOVIES_CSV=/data/movies.csv streamlit run movies.py
+"""
+
+import os
+
+
+def setting(name, default):
+    return os.environ.get(f"PREDICTIO_{name}", default)
+
+
+# Derived data (TF-IDF matrices, fold results, ...) that can be rebuilt at will
+CACHE_DIR = setting("CACHE_DIR", ".cache")
+
+# Prometheus textfile-collector directory: each app process writes its own
+# predictio.<pid>.prom with per-stage latencies (see metrics.py)
+METRICS_DIR = setting("METRICS_DIR", os.path.join(CACHE_DIR, "metrics"))
+
+# Results remembered per model by prediction_cache.py (0 disables caching)
+PREDICTION_CACHE_SIZE = int(setting("PREDICTION_CACHE_SIZE", "1024"))
+
+# Movie recommender
+MOVIES_CSV = setting("MOVIES_CSV", "movies.csv")
+MOVIE_NEIGHBORS_PATH = setting("MOVIE_NEIGHBORS_PATH", "movie_neighbors.bin")
+MOVIE_NEIGHBORS_K = int(setting("MOVIE_NEIGHBORS_K", "50"))
+# "exact" blockwise top-k, or "ann" (movie_ann.IVFIndex) for very large catalogs
+MOVIE_NEIGHBORS_MODE = setting("MOVIE_NEIGHBORS_MODE", "exact")
+
+# Prediction audit log (see audit_log.py). Records wait in a ring buffer of
+# AUDIT_BUFFER_RECORDS for at most AUDIT_FLUSH_SECONDS; record() blocks for up
+# to AUDIT_BLOCK_SECONDS when it is full, then raises
+AUDIT_DIR = setting("AUDIT_DIR", "audit")
+AUDIT_BUFFER_RECORDS = int(setting("AUDIT_BUFFER_RECORDS", "4096"))
+AUDIT_FLUSH_SECONDS = float(setting("AUDIT_FLUSH_SECONDS", "1.0"))
+AUDIT_BLOCK_SECONDS = float(setting("AUDIT_BLOCK_SECONDS", "5.0"))
+AUDIT_MAX_BYTES = int(setting("AUDIT_MAX_BYTES", str(64 << 20)))
+
+# Diabetes SVC with its StandardScaler folded in (see linear_export.py)
+DIABETES_SCORER = setting("DIABETES_SCORER", "diabetes_linear.npz")
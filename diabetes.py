@@ -1,12 +1,24 @@
 import streamlit as st
-import joblib
+import config
+from model_registry import get_entry
+from linear_export import load_linear
+from prediction_cache import get_cache
+from audit_log import AuditError, get_audit_log
+from features import DIABETES_COLUMNS
 import numpy as np
-from sklearn.svm import SVC
-import time
+from metrics import StageTimer, write_prometheus
 
-# Load the trained model
-with open("trained_model.pkl", "rb") as file:
-    model = joblib.load(file)
+# Load the model exported with its scaler folded in (cached across reruns).
+# The raw SVC expects standardised inputs, so without the export the
+# predictions below are unreliable and the page says so.
+stages = StageTimer("diabetes")
+try:
+    entry = get_entry(config.DIABETES_SCORER, loader=load_linear)
+    scaler_missing = False
+except FileNotFoundError:
+    entry = get_entry("trained_model.pkl")
+    scaler_missing = True
+stages.lap("load")
 
 # Page Configuration
 st.set_page_config(
@@ -40,6 +52,10 @@ st.markdown("""
 
 # Title
 st.markdown("<h1 style='text-align: center;'>🧬 Diabetes Prediction App</h1>", unsafe_allow_html=True)
+if scaler_missing:
+    st.warning("⚠️ The model was trained on standardised inputs but no scaler was found, "
+               "so predictions are unreliable. Export one with "
+               "`python linear_export.py diabetes --fit-scaler diabetes.csv`.")
 st.markdown("<p style='text-align: center; color: gray;'>Get your diabetes risk percentage with ML 🚑</p>", unsafe_allow_html=True)
 st.markdown("---")
 
@@ -62,30 +78,42 @@ with st.sidebar:
 
 # Prediction
 if predict_button:
-    with st.spinner("🔍 Analyzing health parameters..."):
-        time.sleep(2)  # Simulate processing time
-
+    stages.restart()
     st.subheader("📊 Prediction Result")
 
     input_data = np.array([[pregnancies, glucose, blood_pressure, skin_thickness, insulin, bmi, dpf, age]])
-    prediction = model.predict(input_data)[0]
-    probability = model.predict_proba(input_data)[0][1] * 100
+    stages.lap("input")
+    # Reruns with unchanged inputs are answered from the cache
+    labels, proba = get_cache("diabetes").predict(entry, input_data)
+    prediction = labels[0]
+    # The shipped SVC was fitted without probability=True
+    probability = "n/a" if proba is None else f"{proba[0][1] * 100:.2f}%"
+    stages.lap("predict")
+    # Queued for the audit log; written by a background thread
+    try:
+        get_audit_log("diabetes", DIABETES_COLUMNS).record(entry.checksum, input_data, labels, proba)
+    except AuditError as e:
+        st.error(f"❌ Prediction not shown: it could not be recorded in the audit log ({e})")
+        st.stop()
+    stages.lap("audit")
 
     if prediction == 1:
         st.markdown(f"### 📈 **Prediction: Diabetes**")
         st.error(f"⚠️ High Risk of Diabetes Detected!")
-        st.markdown(f"### 🔴 **Probability: {probability:.2f}%**")
+        st.markdown(f"### 🔴 **Probability: {probability}**")
         st.markdown("💡 Please consult a healthcare professional.")
         st.image("https://media.giphy.com/media/fAnEC88LccN7a/giphy.gif", caption="Warning Signal", use_column_width=True)
 
     else:
         st.markdown(f"### 📈 **Prediction: No Diabetes**")
         st.success(f"✅ No Risk of Diabetes Detected.")
-        st.markdown(f"### 🟢 **Probability: {probability:.2f}%**")
+        st.markdown(f"### 🟢 **Probability: {probability}**")
         st.markdown("🎉 Keep up your healthy lifestyle!")
         
         # Flower/Confetti Animation
         st.balloons()
+    stages.lap("render")
+    write_prometheus()
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,367 @@
+"""Feature layouts shared by the Streamlit apps, the batch scorer and the server.
+
+Every model is described by a ``ModelSpec``: the artifact it loads and a
+``FeatureSchema`` giving the column order, valid range and encoding of each
+input. The schema writes straight into a reusable float32 buffer, so the apps
+fill one row from sidebar widgets by name (``fill_row``) and headless callers
+pass whole DataFrames (``fill``) without building intermediate frames or
+lists. Ranges are domain limits (a humidity above 100%, a negative insulin
+level), not the tighter bounds of the app widgets.
+
+pandas is only imported by the batch and error paths, so an app that fills
+single rows starts without it.
+"""
+
+import re
+import threading
+
+import numpy as np
+
+import config
+from forest_compiler import load_compiled, load_forest
+from linear_export import load_linear
+from model_registry import get_entry, load_model
+
+_OPTION_CODE = re.compile(r"\((\d)[^(]*$")
+
+
+def parse_options(series):
+    """Return the numbers in sidebar options such as ``"FLAT (1)"``.
+
+    Plain numbers pass through unchanged.
+    """
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    extracted = series.astype(str).str.extract(_OPTION_CODE, expand=False)
+    return pd.to_numeric(extracted.fillna(series), errors="coerce")
+
+
+class OptionCodes:
+    """Encoder for sidebar options that carry their code in parentheses."""
+
+    def __call__(self, series):
+        return parse_options(series)
+
+    def one(self, value):
+        match = _OPTION_CODE.search(value) if isinstance(value, str) else None
+        return int(match.group(1)) if match else value
+
+
+class Categories:
+    """Encoder that maps labels through a fixed ``{label: code}`` dict."""
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+
+    def __call__(self, series):
+        import pandas as pd
+
+        if pd.api.types.is_numeric_dtype(series):
+            return series
+        return series.map(self.mapping)
+
+    def one(self, value):
+        return self.mapping.get(value, value)
+
+
+class SavedCategories:
+    """Encoder that applies the LabelEncoder saved for ``column`` in ``path``."""
+
+    def __init__(self, path, column):
+        self.path = path
+        self.column = column
+
+    def _encoder(self):
+        from category_encoder import load_encoder
+
+        return load_model(self.path, loader=load_encoder)
+
+    def __call__(self, series):
+        return self._encoder().encode(self.column, series, strict=False)
+
+    def one(self, value):
+        return self._encoder().encode(self.column, [value], strict=False)[0]
+
+
+class Feature:
+    """One model input: its name, valid closed range and optional encoder."""
+
+    def __init__(self, name, low=-np.inf, high=np.inf, integer=False, encode=None):
+        self.name = name
+        self.low = low
+        self.high = high
+        self.integer = integer
+        self.encode = encode
+
+    def describe(self):
+        kind = "an integer" if self.integer else "a number"
+        if np.isfinite(self.low) and np.isfinite(self.high):
+            return f"{kind} in [{self.low:g}, {self.high:g}]"
+        if np.isfinite(self.low):
+            return f"{kind} >= {self.low:g}"
+        if np.isfinite(self.high):
+            return f"{kind} <= {self.high:g}"
+        return kind
+
+
+class FeatureSchema:
+    """Column order, dtype, ranges and encoders of one model's input matrix.
+
+    ``fill`` and ``fill_row`` return a view of a float32 buffer owned by the
+    calling thread and grown on demand; it is overwritten by that thread's
+    next fill, so pass ``out`` (see ``allocate``) for a matrix that must
+    outlive the call or cross to another thread.
+    """
+
+    dtype = np.float32
+
+    def __init__(self, name, features):
+        self.name = name
+        self.features = list(features)
+        self.columns = [feature.name for feature in self.features]
+        # Bounds in the buffer's dtype, so a value equal to a bound stays in range
+        self._low = np.array([f.low for f in self.features], dtype=self.dtype)
+        self._high = np.array([f.high for f in self.features], dtype=self.dtype)
+        self._integer = np.array([f.integer for f in self.features])
+        self._any_integer = bool(self._integer.any())
+        self._local = threading.local()
+
+    def allocate(self, n):
+        """Return a new, uninitialized (n, n_features) matrix."""
+        return np.empty((n, len(self.features)), dtype=self.dtype)
+
+    def buffer(self, n):
+        """Return this thread's reusable buffer, viewed as (n, n_features)."""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or len(buffer) < n:
+            grown = 0 if buffer is None else 2 * len(buffer)
+            buffer = self._local.buffer = self.allocate(max(n, grown, 1))
+        return buffer[:n]
+
+    def check_model(self, model):
+        """Raise ``ValueError`` unless ``model`` expects exactly these columns in order."""
+        names = getattr(model, "feature_names_in_", None)
+        if names is None:
+            names = getattr(model, "feature_names", None)
+        if names is not None and list(names) != self.columns:
+            raise ValueError(f"{self.name}: model expects columns {list(names)}, "
+                             f"schema has {self.columns}")
+        n_features = getattr(model, "n_features_in_", len(self.columns))
+        if n_features != len(self.columns):
+            raise ValueError(f"{self.name}: model expects {n_features} features, "
+                             f"schema has {len(self.columns)}")
+        return model
+
+    def fill(self, data, out=None):
+        """Encode and validate a batch in column order.
+
+        ``data`` is a DataFrame or a ``{column: values}`` mapping; extra
+        columns are ignored. Raises ``ValueError`` naming every column with
+        values that are missing, not numeric or out of range.
+        """
+        import pandas as pd
+
+        missing = [column for column in self.columns if column not in data]
+        if missing:
+            raise ValueError(f"{self.name}: missing columns {missing}")
+        n = len(data[self.columns[0]])
+        X = self.buffer(n) if out is None else out
+        if X.shape != (n, len(self.columns)):
+            raise ValueError(f"out must have shape {(n, len(self.columns))}")
+
+        for j, feature in enumerate(self.features):
+            values = data[feature.name]
+            if feature.encode is not None:
+                if not isinstance(values, pd.Series):
+                    values = pd.Series(values)
+                values = feature.encode(values)
+            values = np.asarray(values)
+            if values.dtype.kind not in "biuf":
+                values = pd.to_numeric(values, errors="coerce")
+            X[:, j] = values
+        self._validate(X, data)
+        return X
+
+    def fill_row(self, values, out=None):
+        """Encode and validate one ``{column: value}`` dict as a (1, n_features) matrix.
+
+        Every column must be given by name, so values cannot land in the
+        wrong position. Extra keys are ignored, as ``fill`` ignores extra
+        columns, so a row is accepted alone or as part of a batch alike.
+        """
+        missing = [column for column in self.columns if column not in values]
+        if missing:
+            raise ValueError(f"{self.name}: missing columns {missing}")
+        X = self.buffer(1) if out is None else out
+        row = X[0]
+        for j, feature in enumerate(self.features):
+            value = values[feature.name]
+            if feature.encode is not None:
+                value = feature.encode.one(value)
+            try:
+                row[j] = value
+            except (TypeError, ValueError):
+                row[j] = np.nan
+        self._validate(X, {column: [values[column]] for column in self.columns})
+        return X
+
+    def _validate(self, X, data):
+        # NaN fails both comparisons, so it is reported as out of range
+        valid = (X >= self._low) & (X <= self._high)
+        if self._any_integer:
+            valid &= ~self._integer | (X == np.floor(X))
+        if valid.all():
+            return
+        import pandas as pd
+
+        problems = []
+        for j in np.flatnonzero(~valid.all(axis=0)):
+            feature = self.features[j]
+            rows = np.flatnonzero(~valid[:, j])
+            bad = pd.unique(np.asarray(data[feature.name], dtype=object)[rows[:20]])[:5]
+            problems.append(f"'{feature.name}' must be {feature.describe()}, got {bad.tolist()}")
+        raise ValueError(f"{self.name}: invalid values: " + "; ".join(problems))
+
+
+class ModelSpec:
+    """Artifact path and input schema for one model."""
+
+    def __init__(self, name, path, features, loader=load_forest):
+        self.name = name
+        self.path = path
+        self.schema = FeatureSchema(name, features)
+        self.loader = loader
+
+    @property
+    def columns(self):
+        return self.schema.columns
+
+    @staticmethod
+    def _unwrap(loaded):
+        # churn_model.pkl stores {"model": ..., "features_names": [...]}
+        if isinstance(loaded, dict) and "model" in loaded:
+            return loaded["model"]
+        return loaded
+
+    def entry(self):
+        """Return the registry entry, after checking the model expects the schema's columns."""
+        entry = get_entry(self.path, loader=self.loader)
+        self.schema.check_model(self._unwrap(entry.model))
+        return entry
+
+    def load(self):
+        return self._unwrap(self.entry().model)
+
+
+# Heart: sidebar options carry their code in parentheses, e.g. "FLAT (1)"
+HEART_COLUMNS = ["age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
+                 "thalach", "exang", "oldpeak", "slope", "ca", "thal"]
+HEART_SEX = {"MALE": 1, "FEMALE": 0, "Male": 1, "Female": 0}
+HEART_FEATURES = [
+    Feature("age", 1, 120),
+    Feature("sex", 0, 1, integer=True, encode=Categories(HEART_SEX)),
+    Feature("cp", 0, 3, integer=True, encode=OptionCodes()),
+    Feature("trestbps", 0),
+    Feature("chol", 0),
+    Feature("fbs", 0, 1, integer=True, encode=OptionCodes()),
+    Feature("restecg", 0, 2, integer=True, encode=OptionCodes()),
+    Feature("thalach", 0),
+    Feature("exang", 0, 1, integer=True, encode=OptionCodes()),
+    Feature("oldpeak"),
+    Feature("slope", 0, 2, integer=True, encode=OptionCodes()),
+    Feature("ca", 0, 4, integer=True),
+    Feature("thal", 0, 3, integer=True, encode=OptionCodes()),
+]
+
+# Diabetes: PIMA dataset column names
+DIABETES_COLUMNS = ["Pregnancies", "Glucose", "BloodPressure", "SkinThickness",
+                    "Insulin", "BMI", "DiabetesPedigreeFunction", "Age"]
+DIABETES_FEATURES = [Feature(column, 0) for column in DIABETES_COLUMNS]
+
+# Wine: UCI red wine dataset column names
+WINE_COLUMNS = ["fixed acidity", "volatile acidity", "citric acid", "residual sugar",
+                "chlorides", "free sulfur dioxide", "total sulfur dioxide",
+                "density", "pH", "sulphates", "alcohol"]
+WINE_FEATURES = [Feature(column, 0, 14 if column == "pH" else np.inf)
+                 for column in WINE_COLUMNS]
+
+# Rainfall: order the model was trained with (differs from the sidebar order)
+RAINFALL_COLUMNS = ["pressure", "dewpoint", "humidity", "cloud", "sunshine",
+                    "winddirection", "windspeed"]
+RAINFALL_FEATURES = [
+    Feature("pressure", 0),
+    Feature("dewpoint"),
+    Feature("humidity", 0, 100),
+    Feature("cloud", 0, 100),
+    Feature("sunshine", 0, 24),
+    Feature("winddirection", 0, 360),
+    Feature("windspeed", 0),
+]
+
+# Breast cancer: sklearn.datasets.load_breast_cancer feature names
+BREAST_MEASURES = ["radius", "texture", "perimeter", "area", "smoothness",
+                   "compactness", "concavity", "concave points", "symmetry",
+                   "fractal dimension"]
+BREAST_COLUMNS = ([f"mean {name}" for name in BREAST_MEASURES]
+                  + [f"{name} error" for name in BREAST_MEASURES]
+                  + [f"worst {name}" for name in BREAST_MEASURES])
+BREAST_FEATURES = [Feature(column, 0) for column in BREAST_COLUMNS]
+
+# Churn: Telco customer churn columns; categorical ones use the LabelEncoders
+# saved with the model (encoder.pkl)
+CHURN_COLUMNS = ["gender", "SeniorCitizen", "Partner", "Dependents", "tenure",
+                 "PhoneService", "MultipleLines", "InternetService", "OnlineSecurity",
+                 "OnlineBackup", "DeviceProtection", "TechSupport", "StreamingTV",
+                 "StreamingMovies", "Contract", "PaperlessBilling", "PaymentMethod",
+                 "MonthlyCharges", "TotalCharges"]
+CHURN_CATEGORICAL = ["gender", "Partner", "Dependents", "PhoneService", "MultipleLines",
+                     "InternetService", "OnlineSecurity", "OnlineBackup", "DeviceProtection",
+                     "TechSupport", "StreamingTV", "StreamingMovies", "Contract",
+                     "PaperlessBilling", "PaymentMethod"]
+CHURN_ENCODER_PATH = "encoder.pkl"
+CHURN_FEATURES = [
+    Feature(column, 0, integer=True, encode=SavedCategories(CHURN_ENCODER_PATH, column))
+    if column in CHURN_CATEGORICAL
+    else Feature(column, 0, 1, integer=True) if column == "SeniorCitizen"
+    else Feature(column, 0)
+    for column in CHURN_COLUMNS
+]
+
+# Parkinson's: UCI voice-measurement columns (parkinsons.data without name and
+# status), as stored in new_parkinsons_scaler.sav
+PARKINSONS_COLUMNS = ["MDVP:Fo(Hz)", "MDVP:Fhi(Hz)", "MDVP:Flo(Hz)", "MDVP:Jitter(%)",
+                      "MDVP:Jitter(Abs)", "MDVP:RAP", "MDVP:PPQ", "Jitter:DDP",
+                      "MDVP:Shimmer", "MDVP:Shimmer(dB)", "Shimmer:APQ3", "Shimmer:APQ5",
+                      "MDVP:APQ", "Shimmer:DDA", "NHR", "HNR", "RPDE", "DFA",
+                      "spread1", "spread2", "D2", "PPE"]
+PARKINSONS_FEATURES = [
+    # spread1 is a log-scale spread and negative; HNR is a dB ratio
+    Feature(column) if column in ("spread1", "HNR")
+    else Feature(column, 0, 1) if column in ("RPDE", "DFA")
+    else Feature(column, 0)
+    for column in PARKINSONS_COLUMNS
+]
+
+MODELS = {
+    "heart": ModelSpec("heart", "heart_disease_model.pkl", HEART_FEATURES, loader=load_linear),
+    # Only served once exported with its scaler: the raw SVC expects scaled inputs
+    "diabetes": ModelSpec("diabetes", config.DIABETES_SCORER, DIABETES_FEATURES,
+                          loader=load_linear),
+    "wine": ModelSpec("wine", "wine_quality_model.pkl", WINE_FEATURES),
+    "rainfall": ModelSpec("rainfall", "rainfall_prediction_model.pkl", RAINFALL_FEATURES),
+    "breast": ModelSpec("breast", "Breast_model.pkl", BREAST_FEATURES, loader=load_linear),
+    # Same loader as churn.py, so the app and the server share one cached entry
+    "churn": ModelSpec("churn", "churn_model.pkl", CHURN_FEATURES, loader=load_compiled),
+    # Linear SVC with new_parkinsons_scaler.sav folded into its weights
+    "parkinsons": ModelSpec("parkinsons", "parkinsons_model.sav", PARKINSONS_FEATURES,
+                            loader=load_linear),
+}
+
+
+def get_spec(name):
+    try:
+        return MODELS[name]
+    except KeyError:
+        raise ValueError(f"unknown model '{name}', expected one of {sorted(MODELS)}") from None
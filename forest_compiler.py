@@ -0,0 +1,463 @@
+"""Flat-array inference for fitted random-forest classifiers.
+
+``RandomForestClassifier.predict_proba`` dispatches every tree through
+joblib and Cython one estimator at a time, which dominates single-row
+latency. ``compile_forest`` concatenates all trees into contiguous arrays
+
+    feature    int32    split feature per node
+    threshold  float64  split threshold per node
+    left/right int32    global child ids (a leaf points at itself)
+    value      float64  (n_nodes, n_classes) class fractions per node
+
+and ``CompiledForest`` walks every (tree, row) pair one level at a time
+with NumPy gathers, dropping pairs as they reach a leaf. That wins for the
+small batches the apps and the server send. Past ``flat_batch_limit`` rows
+the per-node gathers cost more than sklearn's compiled traversal, so large
+batches call each tree's Cython ``apply`` directly (still skipping joblib
+and the per-tree probability arrays) and share the same accumulation.
+
+Probabilities are bit-identical to sklearn: X is cast to float32 and
+compared against the float64 thresholds exactly as in ``_tree.pyx``, and
+the leaf values are summed tree by tree in estimator order before the
+division by ``n_estimators``.
+
+    from forest_compiler import load_compiled
+    model = load_model("wine_quality_model.pkl", loader=load_compiled)
+
+Unpickling the sklearn forest dominates cold start, so ``save_packed``
+writes the arrays to a ``.forest.npz`` next to the pickle (float32
+thresholds, narrow indices, deduplicated leaves; see ``save_packed``), and
+``load_forest`` reads that instead whenever it was exported from the same
+pickle. Loading it needs only NumPy. The command line writes the packed
+files, checks them against sklearn and reports size and cold-load time:
+
+    python forest_compiler.py wine_quality_model.pkl rainfall_prediction_model.pkl
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import warnings
+
+import joblib
+import numpy as np
+
+from model_registry import file_checksum
+
+_LEAF = -1
+PACKED_VERSION = 1
+
+
+class CompiledForest:
+    """A random-forest classifier flattened into NumPy arrays.
+
+    Exposes ``predict``, ``predict_proba``, ``classes_``, ``n_features_in_``
+    and (when fitted on a DataFrame) ``feature_names_in_``, so it can stand
+    in for the original estimator.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes,
+                 n_features, feature_names=None, trees=None, flat_batch_limit=32):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        if feature_names is not None:
+            self.feature_names_in_ = feature_names
+        # None: rebuilt from the arrays on the first large batch (packed forests)
+        self.trees = trees
+        self.flat_batch_limit = flat_batch_limit
+        self._is_leaf = left == np.arange(len(left), dtype=left.dtype)
+        # One contiguous row per class makes the per-tree gathers 1-D
+        self._value_t = np.ascontiguousarray(value.T)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def _check_input(self, X):
+        names = getattr(self, "feature_names_in_", None)
+        # Duck-typed DataFrame check, so loading never needs pandas
+        if hasattr(X, "columns") and names is not None:
+            if list(X.columns) != list(names):
+                raise ValueError("feature names must match those seen at fit time")
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X must have shape (n_samples, {self.n_features_in_})")
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity.")
+        return X
+
+    def _use_trees(self, X):
+        if len(X) <= self.flat_batch_limit:
+            return False
+        if self.trees is None:
+            self.trees = self._build_trees()
+        return bool(self.trees)
+
+    def _tree_depths(self):
+        depths = np.zeros(self.n_estimators, dtype=np.int64)
+        node, tree = self.roots.astype(np.int64), np.arange(self.n_estimators)
+        level = 0
+        while node.size:
+            inner = ~self._is_leaf[node]
+            node, tree = node[inner], tree[inner]
+            level += 1
+            depths[tree] = level
+            node, tree = np.concatenate([self.left[node], self.right[node]]), np.tile(tree, 2)
+        return depths - 1
+
+    def _build_trees(self):
+        """Rebuild sklearn ``Tree`` objects for the Cython ``apply`` path.
+
+        Thresholds keep their float32 values, which give the same splits
+        as the originals (see ``floor_float32``). Returns ``[]`` when the
+        installed sklearn cannot take the node layout, leaving the flat path.
+        """
+        try:
+            from sklearn.tree._tree import NODE_DTYPE, Tree
+        except ImportError:
+            return []
+        ends = np.append(self.roots[1:], self.n_nodes)
+        n_classes = np.array([len(self.classes_)], dtype=np.intp)
+        trees = []
+        for root, end, depth in zip(self.roots, ends, self._tree_depths()):
+            leaf = self._is_leaf[root:end]
+            nodes = np.zeros(end - root, dtype=NODE_DTYPE)
+            nodes["left_child"] = np.where(leaf, _LEAF, self.left[root:end] - root)
+            nodes["right_child"] = np.where(leaf, _LEAF, self.right[root:end] - root)
+            nodes["feature"] = np.where(leaf, -2, self.feature[root:end])
+            nodes["threshold"] = np.where(leaf, -2.0, self.threshold[root:end])
+            tree = Tree(self.n_features_in_, n_classes, 1)
+            try:
+                tree.__setstate__({
+                    "max_depth": int(depth),
+                    "node_count": int(end - root),
+                    "nodes": nodes,
+                    "values": np.ascontiguousarray(self.value[root:end, np.newaxis, :]),
+                })
+            except (KeyError, ValueError, TypeError):
+                return []
+            trees.append(tree)
+        return trees
+
+    def _tree_apply(self, X):
+        for tree, root in zip(self.trees, self.roots):
+            yield tree.apply(X) + root
+
+    def _flat_apply(self, X):
+        n, n_features = X.shape
+        flat = X.ravel()
+
+        node = np.repeat(self.roots, n)
+        offset = np.tile(np.arange(n, dtype=np.int64) * n_features, len(self.roots))
+        active = np.flatnonzero(~self._is_leaf[node])
+        while active.size:
+            current = node[active]
+            # float32 feature value vs float64 threshold, as in sklearn
+            go_left = flat[offset[active] + self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            node[active] = current
+            active = active[~self._is_leaf[current]]
+        return node.reshape(len(self.roots), n)
+
+    def apply(self, X):
+        """Return the global leaf id reached by every row in every tree.
+
+        The result has shape (n_estimators, n_samples).
+        """
+        X = self._check_input(X)
+        if self._use_trees(X):
+            return np.stack(list(self._tree_apply(X)))
+        return self._flat_apply(X)
+
+    def predict_proba(self, X):
+        # Leaf values are added tree by tree in estimator order, as in
+        # ForestClassifier.predict_proba (never pairwise), so the sums match
+        X = self._check_input(X)
+        if self._use_trees(X):
+            proba = np.zeros((len(self.classes_), len(X)), dtype=np.float64)
+            for leaves in self._tree_apply(X):
+                for column, values in zip(proba, self._value_t):
+                    column += values.take(leaves)
+        else:
+            leaves = self._flat_apply(X)
+            proba = np.cumsum(self._value_t[:, leaves], axis=1)[:, -1]
+        proba /= len(self.roots)
+        return proba.T.copy()
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def _is_forest(model):
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+    return isinstance(model, (RandomForestClassifier, ExtraTreesClassifier))
+
+
+def compile_forest(model):
+    """Flatten a fitted ``RandomForestClassifier`` (or ExtraTrees) model."""
+    if not _is_forest(model) or model.n_outputs_ != 1:
+        raise TypeError(f"cannot compile {type(model).__name__}: "
+                        "expected a fitted single-output forest classifier")
+
+    n_classes = len(model.classes_)
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        count = tree.node_count
+        ids = np.arange(offset, offset + count, dtype=np.int32)
+        leaf = tree.children_left == _LEAF
+
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(leaf, 0.0, tree.threshold))
+        lefts.append(np.where(leaf, ids, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(leaf, ids, tree.children_right + offset).astype(np.int32))
+        values.append(tree.value[:, 0, :n_classes])
+        roots.append(offset)
+        offset += count
+
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+        roots=np.array(roots, dtype=np.int32),
+        classes=model.classes_,
+        n_features=model.n_features_in_,
+        feature_names=getattr(model, "feature_names_in_", None),
+        trees=[estimator.tree_ for estimator in model.estimators_],
+    )
+
+
+def load_compiled(path):
+    """Registry loader: unpickle ``path`` and compile it when it is a forest.
+
+    Other models are returned unchanged, and a ``{"model": ...}`` bundle
+    (churn_model.pkl) keeps its other keys.
+    """
+    loaded = joblib.load(path)
+    model = loaded.get("model") if isinstance(loaded, dict) else loaded
+    if not _is_forest(model) or model.n_outputs_ != 1:
+        return loaded
+    if isinstance(loaded, dict):
+        return {**loaded, "model": compile_forest(model)}
+    return compile_forest(model)
+
+
+def floor_float32(values):
+    """Round float64 ``values`` down to the nearest float32.
+
+    For any float32 ``x``, ``x <= t`` exactly when ``x <= floor_float32(t)``,
+    so float32 thresholds split float32 inputs the same way sklearn's float64
+    thresholds do.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def packed_path(path):
+    """Return the packed sibling of a pickled forest: ``<stem>.forest.npz``."""
+    return f"{os.path.splitext(path)[0]}.forest.npz"
+
+
+def _index_dtype(limit):
+    return np.min_scalar_type(max(int(limit), 0))
+
+
+def save_packed(path, forest, source_checksum=""):
+    """Write ``forest`` to ``path`` as an uncompressed, pickle-free ``.npz``, atomically.
+
+    Arrays, each in the narrowest dtype that holds it:
+
+        node_counts  int32           nodes per tree (roots are the running sum)
+        feature      uint8/16        split feature per node (0 at leaves)
+        threshold    float32         ``floor_float32`` of the split threshold
+        left/right   uint8/16/32     child ids local to the tree (a leaf
+                                     points at itself)
+        leaf_values  float64         distinct leaf class-fraction rows
+        leaf_index   uint8/16/32     row of ``leaf_values`` for each leaf, in
+                                     node order
+
+    Inner-node values are never read at inference, so they are not stored.
+    ``source_checksum`` is the pickle's ``file_checksum``, used by
+    ``load_forest`` to skip a stale file.
+    """
+    counts = np.diff(np.append(forest.roots, forest.n_nodes))
+    local = np.repeat(forest.roots.astype(np.int64), counts)
+    node_dtype = _index_dtype(counts.max() - 1)
+    leaf = forest._is_leaf
+    leaf_values, leaf_index = np.unique(forest.value[leaf], axis=0, return_inverse=True)
+    names = getattr(forest, "feature_names_in_", None)
+
+    tmp_path = f"{path}.tmp{os.getpid()}.npz"
+    np.savez(
+        tmp_path,
+        version=np.int32(PACKED_VERSION),
+        node_counts=counts.astype(np.int32),
+        feature=forest.feature.astype(_index_dtype(forest.n_features_in_ - 1)),
+        threshold=floor_float32(forest.threshold),
+        left=(forest.left - local).astype(node_dtype),
+        right=(forest.right - local).astype(node_dtype),
+        leaf_values=leaf_values,
+        leaf_index=leaf_index.ravel().astype(_index_dtype(len(leaf_values) - 1)),
+        classes=forest.classes_,
+        n_features=np.int64(forest.n_features_in_),
+        feature_names=np.array(names if names is not None else [], dtype=str),
+        source_checksum=np.str_(source_checksum),
+    )
+    os.replace(tmp_path, path)
+
+
+def load_packed(path):
+    """Registry loader for files written by ``save_packed``."""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != PACKED_VERSION:
+            raise ValueError(f"{path}: packed format version {int(data['version'])}, "
+                             f"expected {PACKED_VERSION}")
+        counts = data["node_counts"]
+        roots = np.zeros(len(counts), dtype=np.int32)
+        np.cumsum(counts[:-1], out=roots[1:])
+        local = np.repeat(roots, counts)
+        left = data["left"].astype(np.int32) + local
+        right = data["right"].astype(np.int32) + local
+
+        leaf_values = data["leaf_values"]
+        leaf = left == np.arange(len(left), dtype=np.int32)
+        value = np.zeros((len(left), leaf_values.shape[1]), dtype=np.float64)
+        value[leaf] = leaf_values[data["leaf_index"]]
+
+        names = data["feature_names"]
+        return CompiledForest(
+            feature=data["feature"].astype(np.int32),
+            threshold=data["threshold"],
+            left=left,
+            right=right,
+            value=value,
+            roots=roots,
+            classes=data["classes"],
+            n_features=int(data["n_features"]),
+            feature_names=names.astype(object) if len(names) else None,
+        )
+
+
+def load_forest(path):
+    """Registry loader: the packed sibling of ``path`` if current, else ``load_compiled``.
+
+    The packed file is used only when it was written from a pickle with
+    the same checksum, so a retrained model is never shadowed by an old export.
+    """
+    packed = packed_path(path)
+    if os.path.exists(packed):
+        with np.load(packed, allow_pickle=False) as data:
+            source = str(data["source_checksum"])
+        if source == file_checksum(path):
+            return load_packed(packed)
+    return load_compiled(path)
+
+
+def _verification_rows(model, rows, rng):
+    """Rows drawn around each feature's thresholds, plus exact threshold hits."""
+    n_features = model.n_features_in_
+    X = rng.normal(size=(rows, n_features))
+    for feature in range(n_features):
+        thresholds = np.concatenate([
+            e.tree_.threshold[e.tree_.feature == feature] for e in model.estimators_])
+        if len(thresholds):
+            low, high = thresholds.min(), thresholds.max()
+            span = (high - low) or 1.0
+            X[:, feature] = rng.uniform(low - 0.1 * span, high + 0.1 * span, rows)
+            # Values exactly on (and one float32 step either side of) a split
+            hits = rng.choice(thresholds, rows // 4).astype(np.float32)
+            steps = rng.integers(-1, 2, len(hits))
+            hits = np.where(steps < 0, np.nextafter(hits, np.float32(-np.inf)),
+                            np.where(steps > 0, np.nextafter(hits, np.float32(np.inf)), hits))
+            X[:len(hits), feature] = hits
+    return X
+
+
+def verify_packed(model, packed, rows=20000, seed=0):
+    """Raise ``AssertionError`` unless ``packed`` matches ``model`` bit for bit.
+
+    Checks small batches (flat path) and one large batch (rebuilt trees).
+    """
+    X = _verification_rows(model, rows, np.random.default_rng(seed))
+    expected = model.predict_proba(X)
+    small = np.concatenate([packed.predict_proba(X[start:start + packed.flat_batch_limit])
+                            for start in range(0, min(rows, 2000), packed.flat_batch_limit)])
+    if not np.array_equal(small, expected[:len(small)]):
+        raise AssertionError("packed forest differs from sklearn on small batches")
+    if not np.array_equal(packed.predict_proba(X), expected):
+        raise AssertionError("packed forest differs from sklearn on a large batch")
+    if not np.array_equal(packed.predict(X), model.predict(X)):
+        raise AssertionError("packed forest predicts different labels")
+
+
+_COLD_LOAD = """
+import time
+start = time.perf_counter()
+import forest_compiler
+model = forest_compiler.{loader}({path!r})
+print(time.perf_counter() - start)
+"""
+
+
+def cold_load_seconds(loader, path, repeat=3):
+    """Best time to import this module and load ``path`` in a fresh interpreter."""
+    times = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", _COLD_LOAD.format(loader=loader, path=path)],
+                              capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+        times.append(float(proc.stdout))
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write packed .forest.npz files for pickled forests and verify them")
+    parser.add_argument("models", nargs="+", help="pickled RandomForestClassifier artifacts")
+    parser.add_argument("--rows", type=int, default=20000,
+                        help="rows compared against sklearn (default 20000)")
+    args = parser.parse_args(argv)
+
+    for path in args.models:
+        path = os.path.abspath(path)
+        with warnings.catch_warnings():
+            # Version-mismatch and feature-name warnings from the old pickles
+            warnings.simplefilter("ignore")
+            model = joblib.load(path)
+            if not _is_forest(model):
+                parser.error(f"{path} is not a forest classifier")
+            output = packed_path(path)
+            save_packed(output, compile_forest(model), file_checksum(path))
+            verify_packed(model, load_packed(output), args.rows)
+
+        pickled, packed = os.path.getsize(path), os.path.getsize(output)
+        pickled_load = cold_load_seconds("load_compiled", path)
+        packed_load = cold_load_seconds("load_packed", output)
+        print(f"{os.path.basename(path)} -> {os.path.basename(output)}: "
+              f"identical on {args.rows:,} rows")
+        print(f"  size       {pickled / 1e6:8.2f} MB -> {packed / 1e6:8.2f} MB "
+              f"({pickled / packed:.1f}x smaller)")
+        print(f"  cold load  {pickled_load * 1000:8.1f} ms -> {packed_load * 1000:8.1f} ms "
+              f"({pickled_load / packed_load:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
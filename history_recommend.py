@@ -0,0 +1,78 @@
+"""Batch recommendations from watch histories.
+
+Input is a long-format CSV with one watched title per line and an optional
+weight (e.g. a rating)::
+
+    user_id,title,weight
+    u1,Avatar,5
+    u1,Titanic,3
+
+All users are scored together by one sparse product over the neighbour store
+(see ``recommender.recommend_batch``); watched titles are never recommended.
+
+    python history_recommend.py histories.csv -o recommendations.csv -n 14
+"""
+
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+import config
+from neighbor_store import open_store
+from recommender import neighbor_graph, recommend_batch
+
+
+def recommend_histories(store, histories, count=14):
+    """Return a long-format DataFrame of recommendations per user."""
+    row_of = {}
+    for row, title in enumerate(store.titles()):
+        row_of.setdefault(title, row)
+
+    histories = histories.assign(row=histories["title"].map(row_of))
+    unknown = histories["row"].isna()
+    if unknown.any():
+        print(f"Ignoring {unknown.sum()} rows with unknown titles", file=sys.stderr)
+        histories = histories[~unknown]
+    if "weight" not in histories:
+        histories = histories.assign(weight=1.0)
+
+    grouped = histories.groupby("user_id", sort=False)
+    users = list(grouped.groups)
+    movie_ids = [group["row"].astype(int).tolist() for _, group in grouped]
+    weights = [group["weight"].astype(float).tolist() for _, group in grouped]
+
+    graph = neighbor_graph(store.indices, store.scores)
+    ids, scores = recommend_batch(graph, movie_ids, count, weights)
+
+    result = pd.DataFrame({
+        "user_id": pd.Series(users).repeat(count).to_numpy(),
+        "rank": list(range(1, count + 1)) * len(users),
+        "movie_id": ids.ravel(),
+        "score": scores.ravel(),
+    })
+    result = result[result["movie_id"] >= 0]
+    result.insert(2, "title", [store.title(i) for i in result["movie_id"]])
+    return result.drop(columns="movie_id")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch recommendations from watch histories")
+    parser.add_argument("histories", help="CSV with user_id,title[,weight] columns, or '-'")
+    parser.add_argument("-o", "--output", default="-", help="output CSV (default: stdout)")
+    parser.add_argument("-n", "--count", type=int, default=14)
+    parser.add_argument("--store", default=config.MOVIE_NEIGHBORS_PATH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    histories = pd.read_csv(sys.stdin if args.histories == "-" else args.histories)
+    with open_store(args.store) as store:
+        result = recommend_histories(store, histories, args.count)
+    result.to_csv(sys.stdout if args.output == "-" else args.output, index=False)
+    print(f"Recommended for {result['user_id'].nunique()} users in "
+          f"{time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
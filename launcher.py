@@ -0,0 +1,139 @@
+"""Start several Streamlit apps from one pre-warmed parent process.
+
+A cold ``streamlit run`` pays for the interpreter, the imports (streamlit,
+numpy, joblib, ...) and the first model load before the page appears.
+The launcher does all of that once: it runs every app's top-level imports,
+loads each model in ``features.MODELS`` into the registry, and then forks
+one child per app. Children start with the modules and models already in
+memory (shared copy-on-write with the parent), so a server is up as soon
+as it binds its port, and the first session does not wait on a load.
+
+    python launcher.py Heart.py wine.py breast.py --port 8501
+    python launcher.py --warm-only          # just report what warming costs
+
+Fork is POSIX-only. The parent starts no threads before forking.
+"""
+
+import argparse
+import ast
+import os
+import signal
+import sys
+import time
+
+APPS = ["Heart.py", "diabetes.py", "breast.py", "wine.py", "RNP.py",
+        "parkinsons.py", "churn.py", "movies.py", "cgpa.py"]
+
+
+def app_imports(path):
+    """Return the source of each top-level import statement in script ``path``."""
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read(), filename=path)
+    return [ast.unparse(node) for node in tree.body
+            if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def warm(apps):
+    """Import what ``apps`` import and load every available model.
+
+    Returns ``{step: seconds}``. Models whose artifact is missing or cannot
+    be served are skipped with a note on stderr, as the apps report them.
+    """
+    timings = {}
+    start = time.perf_counter()
+    for path in apps:
+        for statement in app_imports(path):
+            exec(statement, {})
+    # What `streamlit run` imports before it executes the script
+    import streamlit.web.cli  # noqa: F401
+
+    timings["imports"] = time.perf_counter() - start
+
+    from features import MODELS
+
+    for name, spec in MODELS.items():
+        start = time.perf_counter()
+        try:
+            spec.entry()
+        # ValueError covers linear_export.ScalerMissingError and schema mismatches
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Not preloading '{name}': {e}", file=sys.stderr)
+            continue
+        timings[f"load {name}"] = time.perf_counter() - start
+    return timings
+
+
+def run_app(path, port):
+    """Serve ``path`` on ``port`` in this process, as ``streamlit run`` would."""
+    from streamlit.web import cli
+
+    cli.main(["run", path, "--server.port", str(port), "--server.headless", "true"],
+             prog_name="streamlit")
+
+
+def launch(apps, port):
+    """Fork one child per app on consecutive ports and wait for them all."""
+    children = {}
+    for offset, path in enumerate(apps):
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                run_app(path, port + offset)
+                status = 0
+            except SystemExit as e:
+                status = e.code if isinstance(e.code, int) else 1
+            finally:
+                os._exit(status)
+        children[pid] = path
+        print(f"{path} -> http://localhost:{port + offset} (pid {pid})", file=sys.stderr)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    failed = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        path = children.pop(pid, None)
+        if path is not None and os.waitstatus_to_exitcode(status) not in (0, -signal.SIGTERM):
+            print(f"{path} exited with status {os.waitstatus_to_exitcode(status)}", file=sys.stderr)
+            failed += 1
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fork pre-warmed Streamlit apps")
+    parser.add_argument("apps", nargs="*", help=f"default: {' '.join(APPS)}")
+    parser.add_argument("--port", type=int, default=8501,
+                        help="port of the first app; the others follow (default 8501)")
+    parser.add_argument("--warm-only", action="store_true",
+                        help="warm up, print the timings and exit")
+    args = parser.parse_args(argv)
+    if not hasattr(os, "fork"):
+        parser.error("forking is not available on this platform")
+
+    apps = args.apps or APPS
+    missing = [path for path in apps if not os.path.exists(path)]
+    if missing:
+        parser.error(f"no such app: {', '.join(missing)}")
+
+    timings = warm(apps)
+    for step, seconds in timings.items():
+        print(f"{step:20s} {seconds * 1000:8.1f} ms", file=sys.stderr)
+    print(f"{'warm total':20s} {sum(timings.values()) * 1000:8.1f} ms", file=sys.stderr)
+    if args.warm_only:
+        return 0
+    return launch(apps, args.port)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
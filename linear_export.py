@@ -0,0 +1,265 @@
+"""Coefficient-only scorers for the linear models.
+
+heart_disease_model.pkl and Breast_model.pkl are LogisticRegression models.
+trained_model.pkl (diabetes) and parkinsons_model.sav are linear-kernel
+SVCs trained on standardised inputs. Exporting folds the scaler into the
+weights,
+
+    w' = coef / scale
+    b' = intercept - sum(coef * mean / scale)
+
+so scoring is one affine op ``X @ w' + b'`` followed by a sigmoid (logistic
+regression), Platt scaling (SVC fitted with ``probability=True``) or just
+the sign. The scorer is stored as a small ``.npz`` with no pickle.
+
+An SVC trained on standardised data cannot be exported without its scaler.
+The Parkinsons scaler ships as new_parkinsons_scaler.sav. Diabetes has no
+saved scaler, so one must be refitted from the training CSV
+(``--fit-scaler``), as in the notebook, or skipping it must be explicit
+(``--unscaled``).
+
+    python linear_export.py heart
+    python linear_export.py diabetes --fit-scaler diabetes.csv
+"""
+
+import argparse
+import os
+
+import joblib
+import numpy as np
+
+from model_registry import file_checksum
+
+# libsvm clips pairwise probabilities to [MIN_PROB, 1 - MIN_PROB]
+MIN_PROB = 1e-7
+
+# Artifacts with a linear model: (model path, scaler path).
+# REQUIRED marks a model trained on standardised data without a saved scaler.
+REQUIRED = "required"
+EXPORTS = {
+    "heart": ("heart_disease_model.pkl", None),
+    "breast": ("Breast_model.pkl", None),
+    "diabetes": ("trained_model.pkl", REQUIRED),
+    "parkinsons": ("parkinsons_model.sav", "new_parkinsons_scaler.sav"),
+}
+
+
+class ScalerMissingError(ValueError):
+    """Raised when a model trained on scaled inputs is exported without a scaler."""
+
+
+class LinearScorer:
+    """A binary linear classifier reduced to one weight vector and a bias.
+
+    ``link`` is ``"logistic"`` or ``"svm"``; SVM scorers only offer
+    ``predict_proba`` when Platt parameters were exported.
+    """
+
+    def __init__(self, weights, bias, classes, link, platt=None, scaled=False,
+                 feature_names=None, source_checksum=""):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.classes_ = np.asarray(classes)
+        self.link = link
+        self.platt = None if platt is None else tuple(float(v) for v in platt)
+        self.scaled = scaled
+        self.feature_names = None if feature_names is None else list(feature_names)
+        self.source_checksum = source_checksum
+        self.n_features_in_ = len(self.weights)
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X must have shape (n_samples, {self.n_features_in_})")
+        return X @ self.weights + self.bias
+
+    def _positive(self, decision):
+        # libsvm assigns a zero decision value to classes_[1]
+        return decision >= 0 if self.link == "svm" else decision > 0
+
+    def predict(self, X):
+        return self.predict_with_margin(X)[0]
+
+    def predict_with_margin(self, X):
+        """Return ``(labels, decision values)`` from one pass over ``X``."""
+        decision = self.decision_function(X)
+        return self.classes_[self._positive(decision).astype(np.intp)], decision
+
+    def _proba_positive(self, decision):
+        # Imported here: scipy adds ~0.2 s to every app's cold start
+        from scipy.special import expit
+
+        if self.link == "logistic":
+            return expit(decision)
+        # libsvm's Platt sigmoid gives the probability of classes_[0]. sklearn
+        # then runs its pairwise coupling solver, which is only iterated to a
+        # 0.0025 tolerance, so results agree with predict_proba to about that.
+        a, b = self.platt
+        negative = np.clip(expit(a * decision - b), MIN_PROB, 1 - MIN_PROB)
+        return 1 - negative
+
+    @property
+    def predict_proba(self):
+        if self.link != "logistic" and self.platt is None:
+            raise AttributeError("predict_proba is not available: the SVC was fitted "
+                                 "with probability=False")
+        return self._predict_proba
+
+    def _predict_proba(self, X):
+        positive = self._proba_positive(self.decision_function(X))
+        return np.column_stack([1 - positive, positive])
+
+    def score_row(self, values):
+        """Return ``(label, probabilities or None)`` for one feature vector."""
+        decision = float(np.dot(self.weights, np.asarray(values, dtype=np.float64))) + self.bias
+        label = self.classes_[int(self._positive(decision))]
+        if self.link != "logistic" and self.platt is None:
+            return label, None
+        positive = float(self._proba_positive(decision))
+        return label, np.array([1 - positive, positive])
+
+
+def fold_scaler(coef, intercept, mean, scale):
+    """Return ``(weights, bias)`` with a standard scaler folded in."""
+    coef = np.asarray(coef, dtype=np.float64)
+    weights = coef / scale
+    return weights, float(intercept) - float(np.dot(weights, mean))
+
+
+def export_linear(model, scaler=None, source_checksum=""):
+    """Build a ``LinearScorer`` from a fitted binary linear model.
+
+    ``scaler`` is a fitted ``StandardScaler`` applied before ``model``.
+    """
+    classes = model.classes_
+    if len(classes) != 2:
+        raise ValueError("only binary linear models can be exported")
+    if hasattr(model, "kernel"):
+        if model.kernel != "linear":
+            raise ValueError(f"cannot export an SVC with a '{model.kernel}' kernel")
+        link = "svm"
+        # Newer sklearn defaults probability to the string "deprecated"
+        fitted_platt = getattr(model, "probability", False) is True
+        platt = (model.probA_[0], model.probB_[0]) if fitted_platt else None
+    else:
+        link = "logistic"
+        platt = None
+
+    coef = np.ravel(model.coef_.toarray() if hasattr(model.coef_, "toarray") else model.coef_)
+    intercept = np.ravel(model.intercept_)[0]
+    feature_names = getattr(model, "feature_names_in_", None)
+    if scaler is not None:
+        mean = scaler.mean_ if scaler.with_mean else np.zeros_like(coef)
+        scale = scaler.scale_ if scaler.with_std else np.ones_like(coef)
+        weights, bias = fold_scaler(coef, intercept, mean, scale)
+        feature_names = getattr(scaler, "feature_names_in_", feature_names)
+    else:
+        weights, bias = coef, intercept
+    return LinearScorer(weights, bias, classes, link, platt, scaled=scaler is not None,
+                        feature_names=feature_names, source_checksum=source_checksum)
+
+
+def fit_scaler(csv_path, columns):
+    """Refit the notebook's ``StandardScaler`` on ``columns`` of a training CSV."""
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+
+    data = pd.read_csv(csv_path)
+    missing = [column for column in columns if column not in data]
+    if missing:
+        raise ValueError(f"{csv_path}: missing columns {missing}")
+    return StandardScaler().fit(data[columns].to_numpy(dtype=np.float64))
+
+
+def save_scorer(path, scorer):
+    """Write a scorer as an ``.npz`` file, atomically."""
+    tmp_path = f"{path}.tmp{os.getpid()}.npz"
+    np.savez(
+        tmp_path,
+        weights=scorer.weights,
+        bias=np.float64(scorer.bias),
+        classes=scorer.classes_,
+        link=np.str_(scorer.link),
+        platt=np.array(scorer.platt if scorer.platt is not None else [], dtype=np.float64),
+        scaled=np.bool_(scorer.scaled),
+        feature_names=np.array(scorer.feature_names or [], dtype=str),
+        source_checksum=np.str_(scorer.source_checksum),
+    )
+    os.replace(tmp_path, path)
+
+
+def load_scorer(path):
+    """Registry loader for files written by ``save_scorer``."""
+    with np.load(path, allow_pickle=False) as data:
+        platt = data["platt"]
+        names = data["feature_names"]
+        return LinearScorer(
+            data["weights"], data["bias"], data["classes"], str(data["link"]),
+            platt=tuple(platt) if len(platt) else None,
+            scaled=bool(data["scaled"]),
+            feature_names=names.tolist() if len(names) else None,
+            source_checksum=str(data["source_checksum"]),
+        )
+
+
+def load_linear(path):
+    """Registry loader: a ``.npz`` scorer, or a pickled model exported on load.
+
+    Models listed in ``EXPORTS`` get their scaler folded in; a model whose
+    scaler must be refitted raises ``ScalerMissingError``.
+    """
+    if path.endswith(".npz"):
+        return load_scorer(path)
+
+    scaler_path = None
+    for model_path, scaler in EXPORTS.values():
+        if os.path.abspath(model_path) == os.path.abspath(path):
+            scaler_path = scaler
+    if scaler_path == REQUIRED:
+        raise ScalerMissingError(
+            f"{path} was trained on standardised inputs and no scaler was saved; "
+            f"export it with linear_export.py --fit-scaler")
+    scaler = joblib.load(scaler_path) if scaler_path else None
+    return export_linear(joblib.load(path), scaler, file_checksum(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a linear model as a fused scorer")
+    parser.add_argument("model", choices=sorted(EXPORTS))
+    parser.add_argument("-o", "--output", help="default: <model>_linear.npz")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--scaler", help="fitted StandardScaler artifact")
+    group.add_argument("--fit-scaler", metavar="CSV",
+                       help="refit the StandardScaler on the training CSV")
+    group.add_argument("--unscaled", action="store_true",
+                       help="export without a scaler even if training used one")
+    args = parser.parse_args(argv)
+
+    from features import MODELS
+
+    model_path, scaler_path = EXPORTS[args.model]
+    model = joblib.load(model_path)
+    if args.scaler:
+        scaler = joblib.load(args.scaler)
+    elif args.fit_scaler:
+        columns = MODELS[args.model].columns if args.model in MODELS else None
+        if columns is None:
+            parser.error(f"no column list for {args.model}; pass --scaler instead")
+        scaler = fit_scaler(args.fit_scaler, columns)
+    elif args.unscaled or scaler_path is None:
+        scaler = None
+    elif scaler_path == REQUIRED:
+        parser.error(f"{model_path} was trained on standardised inputs and no scaler "
+                     f"was saved: pass --fit-scaler CSV, --scaler PATH or --unscaled")
+    else:
+        scaler = joblib.load(scaler_path)
+
+    scorer = export_linear(model, scaler, file_checksum(model_path))
+    output = args.output or f"{args.model}_linear.npz"
+    save_scorer(output, scorer)
+    print(f"{model_path}: {scorer.link} scorer, {scorer.n_features_in_} weights, "
+          f"scaler {'folded in' if scorer.scaled else 'none'} -> {output}")
+
+
+if __name__ == "__main__":
+    main()
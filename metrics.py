@@ -0,0 +1,187 @@
+"""Rolling latency statistics and per-stage app instrumentation.
+
+Every Streamlit app times the stages of a request (model load, input
+assembly, predict, render) with a ``StageTimer``. Samples are kept per
+(app, stage) in process-wide ``LatencyWindow``s, which survive reruns, and
+``write_prometheus`` exports them as a Prometheus text file that a local
+scraper (e.g. node_exporter's textfile collector) can read. Every process
+writes its own ``predictio.<pid>.prom`` in ``config.METRICS_DIR``, and every
+series carries a ``pid`` label, so separate apps (or launcher.py's forks)
+never overwrite or duplicate each other's series. Files left by processes
+that have exited are removed.
+
+    stages = StageTimer("heart")
+    model = load_model(...)
+    stages.lap("load")
+"""
+
+import collections
+import os
+import threading
+import time
+
+import numpy as np
+
+import config
+from audit_log import audit_stats
+from prediction_cache import cache_stats
+
+QUANTILES = (50, 95, 99)
+
+
+class LatencyWindow:
+    """Keeps the most recent ``size`` latency samples (in seconds)."""
+
+    def __init__(self, size=4096):
+        self._samples = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """Return ``{q: seconds}`` over the current window."""
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=np.float64, count=len(self._samples))
+        if samples.size == 0:
+            return {q: 0.0 for q in qs}
+        return dict(zip(qs, np.percentile(samples, qs).tolist()))
+
+    def summary(self):
+        """Return count, mean and p50/p95/p99/max in milliseconds."""
+        with self._lock:
+            samples = list(self._samples)
+            count, total = self.count, self.total
+        if not samples:
+            return {"count": count, "mean_ms": 0.0, "p50_ms": 0.0,
+                    "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99)).tolist()
+        return {
+            "count": count,
+            "mean_ms": total / count * 1000,
+            "p50_ms": p50 * 1000,
+            "p95_ms": p95 * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": max(samples) * 1000,
+        }
+
+
+_stages_lock = threading.Lock()
+_stages = {}
+
+
+def stage_window(app, stage):
+    """Return the process-wide window for one (app, stage) pair."""
+    with _stages_lock:
+        window = _stages.get((app, stage))
+        if window is None:
+            window = _stages[(app, stage)] = LatencyWindow()
+        return window
+
+
+def stage_summaries():
+    """Return ``{(app, stage): summary}`` for every recorded stage."""
+    with _stages_lock:
+        items = list(_stages.items())
+    return {key: window.summary() for key, window in items}
+
+
+class StageTimer:
+    """Records the time between consecutive laps as named stages of ``app``."""
+
+    def __init__(self, app):
+        self.app = app
+        self.restart()
+
+    def restart(self):
+        self._start = time.perf_counter()
+
+    def lap(self, stage):
+        """Record the time since the last lap (or restart) under ``stage``."""
+        now = time.perf_counter()
+        seconds = now - self._start
+        stage_window(self.app, stage).record(seconds)
+        self._start = now
+        return seconds
+
+
+def prometheus_text():
+    """Render the stage windows, prediction cache and audit log counters as Prometheus text."""
+    with _stages_lock:
+        items = sorted(_stages.items())
+    pid = f'pid="{os.getpid()}"'
+    lines = [
+        "# HELP predictio_stage_latency_seconds Latency of one app request stage "
+        "over the most recent samples.",
+        "# TYPE predictio_stage_latency_seconds summary",
+    ]
+    for (app, stage), window in items:
+        labels = f'app="{app}",stage="{stage}",{pid}'
+        for q, seconds in window.percentiles(QUANTILES).items():
+            lines.append(f'predictio_stage_latency_seconds{{{labels},quantile="{q / 100:g}"}} '
+                         f"{seconds:.9f}")
+        lines.append(f"predictio_stage_latency_seconds_sum{{{labels}}} {window.total:.9f}")
+        lines.append(f"predictio_stage_latency_seconds_count{{{labels}}} {window.count}")
+
+    caches = cache_stats()
+    for metric, kind, help_text in (
+        ("hits", "counter", "Predictions answered from the cache."),
+        ("misses", "counter", "Predictions computed by the model."),
+        ("evictions", "counter", "Least recently used results dropped to stay within maxsize."),
+        ("invalidations", "counter", "Cache flushes caused by a changed model artifact."),
+        ("entries", "gauge", "Results currently cached."),
+    ):
+        name = f"predictio_prediction_cache_{metric}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{model="{model}",{pid}}} {stats[metric]}' for model, stats in caches.items()]
+
+    logs = audit_stats()
+    for metric, kind, help_text in (
+        ("records", "counter", "Predictions queued for the audit log."),
+        ("written", "counter", "Audit records written to disk."),
+        ("blocked", "counter", "Record calls that waited for a full audit buffer."),
+        ("write_errors", "counter", "Failed audit log writes (retried)."),
+        ("pending", "gauge", "Audit records buffered in memory."),
+    ):
+        name = f"predictio_audit_{metric}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{model="{model}",{pid}}} {stats[metric]}' for model, stats in logs.items()]
+    return "\n".join(lines) + "\n"
+
+
+def _remove_stale(directory):
+    for name in os.listdir(directory):
+        parts = name.split(".")
+        if len(parts) != 3 or parts[0] != "predictio" or parts[2] != "prom" or not parts[1].isdigit():
+            continue
+        try:
+            os.kill(int(parts[1]), 0)
+        except ProcessLookupError:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+        except PermissionError:
+            pass  # alive, owned by another user
+
+
+def write_prometheus(path=None):
+    """Atomically write ``prometheus_text()`` to ``path``.
+
+    The default is this process's ``predictio.<pid>.prom`` in
+    ``config.METRICS_DIR``; files there from exited processes are removed.
+    """
+    if path is None:
+        os.makedirs(config.METRICS_DIR, exist_ok=True)
+        _remove_stale(config.METRICS_DIR)
+        path = os.path.join(config.METRICS_DIR, f"predictio.{os.getpid()}.prom")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w") as file:
+        file.write(prometheus_text())
+    os.replace(tmp_path, path)
@@ -0,0 +1,150 @@
+"""Dynamic micro-batching in front of ``predict_proba``.
+
+Concurrent single-row requests for the same model are queued and coalesced
+into one ``predict_proba`` call. A batch is flushed as soon as it reaches
+``max_batch_size`` rows or ``max_wait_ms`` after its first row arrived,
+whichever comes first. The label is derived from the probabilities, so the
+model runs once per batch instead of twice per row.
+
+    batcher = MicroBatcher(model, max_wait_ms=2)
+    label, proba = batcher.predict(row)          # blocking
+    future = batcher.submit(row)                 # concurrent.futures.Future
+
+Tune the window with the built-in load generator:
+
+    python microbatch.py wine --clients 32 --requests 5000 --max-wait-ms 2
+"""
+
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from metrics import LatencyWindow
+from scoring import model_input, predict_with_proba
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Coalesces single-row requests for one model into batched calls."""
+
+    def __init__(self, model, max_batch_size=64, max_wait_ms=2.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._started = time.perf_counter()
+        self.rows = 0
+        self.batches = 0
+        self.latency = LatencyWindow()
+        self.batch_latency = LatencyWindow()
+        self._thread = threading.Thread(target=self._run, name="microbatch", daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Queue one feature row; the future resolves to ``(label, proba)``."""
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64).ravel(), future, time.perf_counter()))
+        return future
+
+    def predict(self, row, timeout=None):
+        return self.submit(row).result(timeout)
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            rows, futures, submitted = zip(*batch)
+            start = time.perf_counter()
+            try:
+                labels, proba = predict_with_proba(self.model, model_input(self.model, np.vstack(rows)))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+
+            self.batches += 1
+            self.rows += len(rows)
+            self.batch_latency.record(done - start)
+            for i, future in enumerate(futures):
+                self.latency.record(done - submitted[i])
+                future.set_result((labels[i], None if proba is None else proba[i]))
+
+    def stats(self):
+        """Return throughput, batch size and latency figures for tuning."""
+        elapsed = time.perf_counter() - self._started
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "rows": self.rows,
+            "batches": self.batches,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "rows_per_second": self.rows / elapsed if elapsed else 0.0,
+            "request_latency": self.latency.summary(),
+            "batch_latency": self.batch_latency.summary(),
+        }
+
+
+def main(argv=None):
+    from features import MODELS, get_spec
+
+    parser = argparse.ArgumentParser(description="Micro-batching load generator")
+    parser.add_argument("model", choices=sorted(MODELS))
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    spec = get_spec(args.model)
+    model = spec.load()
+    rows = np.random.default_rng(0).uniform(0, 1, (args.requests, len(spec.columns)))
+
+    batcher = MicroBatcher(model, args.max_batch_size, args.max_wait_ms)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as clients:
+        list(clients.map(batcher.predict, rows))
+    elapsed = time.perf_counter() - start
+    batcher.close()
+
+    stats = batcher.stats()
+    print(f"{args.requests} requests from {args.clients} clients in {elapsed:.2f}s "
+          f"({args.requests / elapsed:,.0f} req/s)")
+    print(f"batches={stats['batches']} mean_batch_size={stats['mean_batch_size']:.1f}")
+    for name in ("request_latency", "batch_latency"):
+        summary = stats[name]
+        print(f"{name}: p50={summary['p50_ms']:.2f}ms p95={summary['p95_ms']:.2f}ms "
+              f"p99={summary['p99_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Process-wide model registry.
+
+Streamlit re-executes an app script on every widget change, but imported
+modules stay in ``sys.modules``, so anything cached here survives reruns.
+Each artifact is unpickled once per process and loader, and reused until
+the file on disk changes.
+
+    from model_registry import load_model
+    model = load_model("heart_disease_model.pkl")
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import joblib
+
+# _lock guards the two dicts; loads run under the per-entry lock only, so a
+# slow unpickle does not hold up lookups of other artifacts
+_lock = threading.Lock()
+_entries = {}
+_load_locks = {}
+
+
+class ModelEntry:
+    """A loaded artifact plus the file identity it was loaded from."""
+
+    def __init__(self, path, loader, mtime_ns, size, checksum, model, load_seconds):
+        self.path = path
+        self.loader = loader
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.checksum = checksum
+        self.model = model
+        self.load_seconds = load_seconds
+        self.hits = 0
+
+    @property
+    def key(self):
+        return (self.path, self.mtime_ns, self.checksum)
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def loader_name(loader):
+    """Return ``module.name`` for a loader function."""
+    return f"{getattr(loader, '__module__', '?')}.{getattr(loader, '__qualname__', repr(loader))}"
+
+
+def _hit(key, stat):
+    # Caller holds _lock
+    entry = _entries.get(key)
+    if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+        entry.hits += 1
+        return entry
+    return None
+
+
+def get_entry(path, loader=joblib.load):
+    """Return the registry entry for ``path`` loaded by ``loader``, loading it if needed.
+
+    Entries are keyed on the path and the loader, so the same file read by
+    two loaders gives two entries. A stat() call is enough on the hot path.
+    The checksum is only recomputed when mtime or size changed, and the
+    artifact is only re-loaded when the checksum changed too (e.g. a
+    ``touch``). Concurrent callers wait for one load of the same entry.
+    """
+    path = os.path.abspath(path)
+    key = (path, loader)
+    stat = os.stat(path)
+    with _lock:
+        entry = _hit(key, stat)
+        if entry is not None:
+            return entry
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    with load_lock:
+        # Another thread may have loaded it while this one waited
+        stat = os.stat(path)
+        with _lock:
+            entry = _hit(key, stat)
+            if entry is not None:
+                return entry
+            entry = _entries.get(key)
+
+        checksum = file_checksum(path)
+        if entry is not None and entry.checksum == checksum:
+            with _lock:
+                entry.mtime_ns = stat.st_mtime_ns
+                entry.size = stat.st_size
+                entry.hits += 1
+            return entry
+
+        start = time.perf_counter()
+        model = loader(path)
+        load_seconds = time.perf_counter() - start
+        entry = ModelEntry(path, loader, stat.st_mtime_ns, stat.st_size, checksum, model, load_seconds)
+        with _lock:
+            _entries[key] = entry
+        return entry
+
+
+def load_model(path, loader=joblib.load):
+    """Return the cached model stored at ``path``."""
+    return get_entry(path, loader).model
+
+
+def load_timings():
+    """Return ``{(path, loader name): seconds}`` spent loading each cached artifact."""
+    with _lock:
+        return {(entry.path, loader_name(entry.loader)): entry.load_seconds
+                for entry in _entries.values()}
+
+
+def registry_stats():
+    """Return one summary dict per cached artifact."""
+    with _lock:
+        return [
+            {
+                "path": entry.path,
+                "loader": loader_name(entry.loader),
+                "checksum": entry.checksum,
+                "size": entry.size,
+                "load_seconds": entry.load_seconds,
+                "hits": entry.hits,
+            }
+            for entry in _entries.values()
+        ]
+
+
+def clear():
+    """Drop every cached artifact."""
+    with _lock:
+        _entries.clear()
+        _load_locks.clear()
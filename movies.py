@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
-import difflib
-import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import os
+import config
+from metrics import StageTimer, write_prometheus
+from model_registry import get_entry
+from neighbor_store import open_store, StoreFormatError
+from recommender import build_store, neighbor_graph, recommend, recommend_from_history
+from tfidf_cache import load_or_fit
+from title_index import TitleIndex
 
 # Page Config
 st.set_page_config(page_title="🎬 Movie Recommender", layout="centered")
@@ -19,45 +22,81 @@ if uploaded_file is not None:
     st.write(movies_data)
 else:
     st.warning("Please upload the 'movies.csv' file.")
-# Load pre-trained model for movie recommendations
-with open("E:\Machine Learning Projects\similarity_model.pkl", "rb") as file:
-    model = joblib.load(file)
-# Load movie dataset
-@st.cache_data
-def load_data():
-    return pd.read_csv("E:\Datasets\movies.csv")
+# Load movie dataset (cached per process, re-read when movies.csv changes)
+stages = StageTimer("movies")
+movies_entry = get_entry(config.MOVIES_CSV, loader=pd.read_csv)
+movies_data = movies_entry.model
 
-movies_data = load_data()
+# TF-IDF vocabulary, IDF and matrix, persisted under the movies.csv checksum
+@st.cache_resource
+def load_features(movies_checksum):
+    return load_or_fit(movies_data, movies_checksum)
 
-# Select features
-selected_features = ['genres', 'keywords', 'tagline', 'cast', 'director']
-for feature in selected_features:
-    movies_data[feature] = movies_data[feature].fillna('')
+# Open the precomputed top-k neighbour store. It is memory-mapped, so every
+# worker process shares one copy; it is rebuilt when movies.csv changes.
+@st.cache_resource
+def load_neighbors(path, movies_checksum):
+    try:
+        store = open_store(path)
+        if store.source_checksum == movies_checksum:
+            return store
+        store.close()
+    except (FileNotFoundError, StoreFormatError):
+        pass
+    _, feature_vectors = load_features(movies_checksum)
+    build_store(path, feature_vectors, movies_data['title'].tolist(),
+                config.MOVIE_NEIGHBORS_K, movies_checksum, config.MOVIE_NEIGHBORS_MODE)
+    return open_store(path)
 
-# Combine features
-combined_features = movies_data['genres'] + ' ' + movies_data['keywords'] + ' ' + movies_data['tagline'] + ' ' + movies_data['cast'] + ' ' + movies_data['director']
+neighbors = load_neighbors(config.MOVIE_NEIGHBORS_PATH, movies_entry.checksum)
 
-# Vectorize
-vectorizer = TfidfVectorizer()
-feature_vectors = vectorizer.fit_transform(combined_features)
+# Trigram index for typo-tolerant title lookup with O(1) title -> row
+@st.cache_resource
+def load_title_index(movies_checksum):
+    return TitleIndex(movies_data['title'].tolist())
 
-# Compute similarity
-similarity = cosine_similarity(feature_vectors)
+title_index = load_title_index(movies_entry.checksum)
+stages.lap("load")
 
 # User input
 movie_list = movies_data['title'].tolist()
 movie_name = st.selectbox("🎞️ Choose a movie you like:", sorted(movie_list))
 
 if st.button("🔍 Show Recommendations"):
-    find_close_match = difflib.get_close_matches(movie_name, movie_list)
+    stages.restart()
+    find_close_match = title_index.lookup(movie_name)
+    stages.lap("input")
     if find_close_match:
         close_match = find_close_match[0]
-        index_of_movie = movies_data[movies_data.title == close_match].index[0]
-        similarity_scores = list(enumerate(similarity[index_of_movie]))
-        sorted_similar_movies = sorted(similarity_scores, key=lambda x: x[1], reverse=True)[1:15]
+        index_of_movie = title_index.row_of[close_match]
+        recommendations = recommend(neighbors.indices, index_of_movie)
+        stages.lap("predict")
 
         st.success(f"📌 Movies similar to **{close_match}**:")
-        for i, (index, score) in enumerate(sorted_similar_movies):
-            st.write(f"{i+1}. 🎬 {movies_data.iloc[index]['title']}")
+        for i, index in enumerate(recommendations):
+            st.write(f"{i+1}. 🎬 {neighbors.title(index)}")
     else:
         st.error("Sorry, no close match found. Try another title.")
+    stages.lap("render")
+    write_prometheus()
+
+# Recommendations from several watched movies at once
+@st.cache_resource
+def load_graph(movies_checksum):
+    return neighbor_graph(neighbors.indices, neighbors.scores)
+
+st.markdown("---")
+watched = st.multiselect("🍿 Or pick several movies you've watched:", sorted(movie_list))
+
+if st.button("🔍 Recommend from my history") and watched:
+    stages.restart()
+    graph = load_graph(movies_entry.checksum)
+    history = [title_index.row_of[title] for title in watched]
+    stages.lap("input")
+    ids, _ = recommend_from_history(graph, history)
+    stages.lap("predict")
+    st.success(f"📌 Based on {len(watched)} movies you've watched:")
+    for i, index in enumerate(ids):
+        st.write(f"{i+1}. 🎬 {neighbors.title(index)}")
+    stages.lap("render")
+    write_prometheus()
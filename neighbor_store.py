@@ -0,0 +1,119 @@
+"""Versioned, memory-mapped on-disk format for movie neighbour lists.
+
+Layout (little-endian, every section 64-byte aligned)::
+
+    header   magic, version, n, k, section offsets, source checksum
+    ids      int32   [n, k]   neighbour row ids, best first
+    scores   float32 [n, k]   cosine similarity of each neighbour
+    offsets  int64   [n + 1]  byte offsets of each title in the blob
+    titles   utf-8 blob
+
+The file is opened with ``mmap`` and the arrays are zero-copy views into it,
+so every worker process shares the same page-cache pages and opening is
+near-instant regardless of catalog size.
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"MVNBRS\x00\x00"
+VERSION = 1
+ALIGN = 64
+
+# magic, version, n, k, ids, scores, offsets, titles, titles_nbytes, checksum
+_HEADER = struct.Struct("<8sIQIQQQQQ32s")
+
+
+class StoreFormatError(ValueError):
+    pass
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_store(path, indices, scores, titles, source_checksum=""):
+    """Write a neighbour store atomically (readers never see a partial file)."""
+    indices = np.ascontiguousarray(indices, dtype="<i4")
+    scores = np.ascontiguousarray(scores, dtype="<f4")
+    n, k = indices.shape
+    if scores.shape != (n, k) or len(titles) != n:
+        raise ValueError("indices, scores and titles must describe the same movies")
+
+    encoded = [str(title).encode("utf-8") for title in titles]
+    title_offsets = np.zeros(n + 1, dtype="<i8")
+    np.cumsum([len(title) for title in encoded], out=title_offsets[1:])
+    blob = b"".join(encoded)
+
+    ids_at = _align(_HEADER.size)
+    scores_at = _align(ids_at + indices.nbytes)
+    offsets_at = _align(scores_at + scores.nbytes)
+    titles_at = _align(offsets_at + title_offsets.nbytes)
+    header = _HEADER.pack(MAGIC, VERSION, n, k, ids_at, scores_at, offsets_at, titles_at,
+                          len(blob), bytes.fromhex(source_checksum) if source_checksum else b"")
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as file:
+        for offset, data in ((0, header), (ids_at, indices), (scores_at, scores),
+                             (offsets_at, title_offsets), (titles_at, blob)):
+            file.seek(offset)
+            file.write(data)
+    os.replace(tmp_path, path)
+
+
+class NeighborStore:
+    """Read-only, memory-mapped view of a store written by ``write_store``."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise StoreFormatError(f"{path}: file too short")
+        (magic, version, n, k, ids_at, scores_at, offsets_at, titles_at,
+         titles_nbytes, checksum) = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise StoreFormatError(f"{path}: not a neighbour store")
+        if version != VERSION:
+            raise StoreFormatError(f"{path}: unsupported version {version}")
+        if len(self._mmap) < titles_at + titles_nbytes:
+            raise StoreFormatError(f"{path}: truncated file")
+
+        self.n, self.k = n, k
+        self.source_checksum = checksum.hex() if checksum.strip(b"\x00") else ""
+        self.indices = np.frombuffer(self._mmap, "<i4", n * k, ids_at).reshape(n, k)
+        self.scores = np.frombuffer(self._mmap, "<f4", n * k, scores_at).reshape(n, k)
+        self._title_offsets = np.frombuffer(self._mmap, "<i8", n + 1, offsets_at)
+        self._titles_at = titles_at
+
+    def __len__(self):
+        return self.n
+
+    def title(self, i):
+        start, stop = self._title_offsets[i], self._title_offsets[i + 1]
+        return self._mmap[self._titles_at + start:self._titles_at + stop].decode("utf-8")
+
+    def titles(self):
+        return [self.title(i) for i in range(self.n)]
+
+    def neighbors(self, i, count=None):
+        """Return ``(ids, scores)`` of movie ``i``, best first."""
+        return self.indices[i, :count], self.scores[i, :count]
+
+    def close(self):
+        # Drop the array views first; mmap refuses to close while exported
+        self.indices = self.scores = self._title_offsets = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_store(path):
+    return NeighborStore(path)
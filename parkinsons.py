@@ -0,0 +1,147 @@
+import time
+import streamlit as st
+from features import MODELS
+from metrics import StageTimer, write_prometheus
+
+# Page config
+st.set_page_config(page_title="🧠 Parkinson's Disease Predictor", layout="wide")
+
+# Load the linear SVC with new_parkinsons_scaler.sav folded into its weights,
+# so scaling and prediction are one dot product (see linear_export.py)
+stages = StageTimer("parkinsons")
+spec = MODELS["parkinsons"]
+try:
+    model = spec.load()
+    stages.lap("load")
+except FileNotFoundError as e:
+    st.error(f"❌ Model file not found: {e.filename}")
+    st.stop()
+
+LABELS = {0: "✅ Healthy", 1: "⚠️ Parkinson's"}
+
+# Title
+st.markdown("""
+    <h1 style='text-align: center; color: #6a1b9a;'>🧠 Parkinson's Disease Prediction App</h1>
+    <h5 style='text-align: center; color: gray;'>🎙️ Enter voice measurements, or upload a CSV of recordings to score them all at once.</h5>
+    <hr style='border: 1px solid #ccc;'>
+""", unsafe_allow_html=True)
+
+single, batch = st.tabs(["🎙️ One recording", "📂 Batch CSV"])
+
+# One recording: defaults are the sample recording from the training notebook
+DEFAULTS = [145.180762, 188.441463, 106.893558, 0.006989, 0.000051, 0.003757, 0.003900,
+            0.011273, 0.033658, 0.321204, 0.017676, 0.020285, 0.027600, 0.053027,
+            0.029211, 20.974048, 0.516816, 0.725408, -5.333420, 0.248133,
+            2.456058, 0.233828]
+
+with single:
+    values = {}
+    columns = st.columns(3)
+    for i, (name, default) in enumerate(zip(spec.columns, DEFAULTS)):
+        values[name] = columns[i % 3].number_input(name, value=default, format="%.6f")
+
+    if st.button("🔍 PREDICT PARKINSON'S"):
+        stages.restart()
+        try:
+            input_data = spec.schema.fill_row(values)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+        stages.lap("input")
+
+        labels, margins = model.predict_with_margin(input_data)
+        margin = float(margins[0])
+        stages.lap("predict")
+
+        if labels[0] == 1:
+            st.error("⚠️ The voice measurements **indicate Parkinson's disease**. Please consult a neurologist.")
+        else:
+            st.success("✅ The voice measurements look **healthy**.")
+            st.balloons()
+        # The SVC was fitted without probability=True, so show the signed margin instead
+        st.metric(label="📏 Distance from decision boundary", value=f"{margin:+.3f}")
+        stages.lap("render")
+        write_prometheus()
+
+
+def score_recordings(frame):
+    """Validate and score every row of ``frame``; return results and timings."""
+    import pandas as pd
+
+    start = time.perf_counter()
+    X = spec.schema.fill(frame)
+    validated = time.perf_counter()
+    labels, margins = model.predict_with_margin(X)
+    scored = time.perf_counter()
+
+    results = pd.DataFrame({"prediction": labels, "margin": margins}, index=frame.index)
+    if "name" in frame:
+        results.insert(0, "name", frame["name"])
+    return {
+        "results": results,
+        "validate_seconds": validated - start,
+        "score_seconds": scored - validated,
+        "rows_per_second": len(X) / (scored - validated),
+    }
+
+
+# Batch: a CSV with the 22 feature columns (e.g. parkinsons.data); extra
+# columns such as name and status are carried over or used for accuracy.
+# The report is kept per upload so reruns (e.g. the download) don't rescore.
+# pandas is only imported once a file is uploaded.
+with batch:
+    uploaded = st.file_uploader("📂 Upload recordings (CSV)", type="csv")
+    if uploaded is not None:
+        import pandas as pd
+
+        report = st.session_state.get("parkinsons_batch")
+        if report is None or report["file_id"] != uploaded.file_id:
+            stages.restart()
+            try:
+                # pandas' parser errors are ValueErrors too
+                frame = pd.read_csv(uploaded)
+                report = score_recordings(frame)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                st.stop()
+            report["file_id"] = uploaded.file_id
+            if "status" in frame:
+                report["accuracy"] = (report["results"]["prediction"] == frame["status"]).mean()
+            st.session_state["parkinsons_batch"] = report
+            stages.lap("batch_predict")
+            write_prometheus()
+
+        results = report["results"]
+        c1, c2, c3 = st.columns(3)
+        c1.metric("🧾 Recordings", f"{len(results):,}")
+        c2.metric("⏱️ Validate + score",
+                  f"{(report['validate_seconds'] + report['score_seconds']) * 1000:.2f} ms",
+                  delta=f"{report['validate_seconds'] * 1000:.2f} ms validating", delta_color="off")
+        c3.metric("🚀 Throughput", f"{report['rows_per_second']:,.0f} rows/s")
+        st.caption(f"Throughput is the fused scaler + SVC scorer's rate over this one pass of "
+                   f"the {len(results):,} x {len(spec.columns)} matrix.")
+        if "accuracy" in report:
+            st.info(f"🎯 Accuracy against the uploaded status column: {report['accuracy'] * 100:.2f}%")
+
+        st.bar_chart(results["prediction"].map(LABELS).value_counts())
+        st.dataframe(results, use_container_width=True)
+        st.download_button("⬇️ Download predictions", results.to_csv(index=False),
+                           file_name="parkinsons_predictions.csv", mime="text/csv")
+
+# Feature info
+with st.expander("ℹ️ FEATURE INFORMATION", expanded=False):
+    st.markdown("""
+    - **MDVP:Fo / Fhi / Flo (Hz):** Average, maximum and minimum vocal fundamental frequency
+    - **Jitter (%, Abs, RAP, PPQ, DDP):** Variation in fundamental frequency
+    - **Shimmer (dB, APQ3, APQ5, APQ, DDA):** Variation in amplitude
+    - **NHR / HNR:** Noise-to-harmonics and harmonics-to-noise ratios
+    - **RPDE / D2:** Nonlinear dynamical complexity measures
+    - **DFA:** Signal fractal scaling exponent
+    - **spread1 / spread2 / PPE:** Nonlinear measures of fundamental frequency variation
+    """)
+
+# Footer
+st.markdown("""
+<hr>
+<center style='color:gray'>🧠 Built with Streamlit | 💻 Developed by <b>Vishal Kumar</b> | 🔍 Powered by Machine Learning</center>
+""", unsafe_allow_html=True)
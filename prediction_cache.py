@@ -0,0 +1,121 @@
+"""Per-model LRU cache of prediction results.
+
+Streamlit reruns the whole script on every widget change, and clinics
+often query the same patient again, so identical feature vectors reach
+the model over and over. ``PredictionCache`` remembers ``(labels, proba)``
+keyed on the model artifact's checksum plus a hash of the normalized input
+matrix (float64, C order, ``-0.0`` folded into ``0.0``), so ``[[1, 2]]``
+and ``np.float32([[1., 2.]])`` share an entry. When the registry reloads a
+changed artifact its checksum changes and the cache starts over.
+
+    entry = get_entry("wine_quality_model.pkl", loader=load_forest)
+    labels, proba = get_cache("wine").predict(entry, input_data)
+"""
+
+import collections
+import hashlib
+import threading
+
+import numpy as np
+
+import config
+from scoring import predict_with_proba
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _frozen(array):
+    if array is not None:
+        array = np.asarray(array)
+        array.setflags(write=False)
+    return array
+
+
+class PredictionCache:
+    """Bounded LRU map from input hashes to ``predict_with_proba`` results."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.checksum = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(checksum, X):
+        """Return the cache key of input matrix ``X`` for the artifact ``checksum``."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[np.newaxis]
+        # Adding +0.0 turns -0.0 into 0.0 so both hash alike
+        digest = hashlib.blake2b((X + 0.0).tobytes(), digest_size=16).digest()
+        return checksum, X.shape, digest
+
+    def predict(self, entry, X):
+        """Return ``(labels, proba)`` for ``X`` from the cache or from ``entry.model``.
+
+        ``entry`` is a ``model_registry.ModelEntry``. The returned arrays
+        are read-only because they may be shared with later calls.
+        """
+        key = self.key(entry.checksum, X)
+        with self._lock:
+            if self.checksum != entry.checksum:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.checksum = entry.checksum
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        labels, proba = predict_with_proba(entry.model, X)
+        result = (_frozen(labels), _frozen(proba))
+        with self._lock:
+            if self.checksum == entry.checksum and self.maxsize > 0:
+                self._entries[key] = result
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def get_cache(name, maxsize=None):
+    """Return the process-wide cache for model ``name``, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            if maxsize is None:
+                maxsize = config.PREDICTION_CACHE_SIZE
+            cache = _caches[name] = PredictionCache(maxsize)
+        return cache
+
+
+def cache_stats():
+    """Return ``{model name: stats dict}`` for every cache created so far."""
+    with _caches_lock:
+        caches = sorted(_caches.items())
+    return {name: cache.stats() for name, cache in caches}
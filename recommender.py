@@ -0,0 +1,195 @@
+"""Content-based movie recommendations from TF-IDF cosine similarity.
+
+Instead of a dense N x N similarity matrix, only the top-k neighbours of
+every movie are kept (int32 ids + float32 scores), computed block by block
+from the sparse TF-IDF matrix. Memory is O(N*k) and a recommendation is an
+O(k) row lookup. The result is written as a memory-mapped neighbour store
+(see ``neighbor_store.py``).
+
+For a watch history the neighbour lists form a sparse N x N graph; the
+(weighted) history is one sparse row vector and its recommendations are a
+single sparse vector-matrix product followed by an argpartition top-k.
+
+    python recommender.py movies.csv -o movie_neighbors.bin -k 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+import config
+from model_registry import file_checksum
+from neighbor_store import write_store
+
+SELECTED_FEATURES = ['genres', 'keywords', 'tagline', 'cast', 'director']
+
+# Upper bound for one dense block of similarity scores
+MAX_BLOCK_BYTES = 256 * 1024 * 1024
+
+
+def combine_features(movies_data):
+    """Join the selected text columns into one document per movie."""
+    features = movies_data[SELECTED_FEATURES].fillna('')
+    return features['genres'] + ' ' + features['keywords'] + ' ' + features['tagline'] + ' ' + features['cast'] + ' ' + features['director']
+
+
+def vectorize(movies_data):
+    """Return the fitted vectorizer and the (N, vocab) TF-IDF matrix."""
+    vectorizer = TfidfVectorizer()
+    feature_vectors = vectorizer.fit_transform(combine_features(movies_data))
+    return vectorizer, feature_vectors
+
+
+def topk_neighbors(feature_vectors, k=50, block_size=None, rows=None):
+    """Return ``(indices, scores)`` of the k most cosine-similar rows.
+
+    Rows are processed in blocks: each block's similarities against the whole
+    catalog are a sparse product, densified only for that block. A movie is
+    never its own neighbour. Neighbours are ordered by descending score, ties
+    by ascending id. ``rows`` restricts the computation to those movie ids.
+    """
+    X = normalize(feature_vectors.astype(np.float32), copy=False).tocsr()
+    XT = X.T.tocsc()
+    n = X.shape[0]
+    k = min(k, n - 1)
+    rows = np.arange(n) if rows is None else np.asarray(rows)
+    if block_size is None:
+        block_size = max(1, min(n, MAX_BLOCK_BYTES // (4 * max(n, 1))))
+
+    indices = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float32)
+    for start in range(0, len(rows), block_size):
+        stop = min(start + block_size, len(rows))
+        block = (X[rows[start:stop]] @ XT).toarray()
+        block[np.arange(stop - start), rows[start:stop]] = -np.inf
+
+        candidates = np.argpartition(block, n - k, axis=1)[:, n - k:]
+        candidate_scores = np.take_along_axis(block, candidates, axis=1)
+        order = np.lexsort((candidates, -candidate_scores), axis=1)
+        indices[start:stop] = np.take_along_axis(candidates, order, axis=1)
+        scores[start:stop] = np.take_along_axis(candidate_scores, order, axis=1)
+    return indices, scores
+
+
+def recommend(indices, index_of_movie, count=14):
+    """Return the ids of the ``count`` nearest neighbours of a movie.
+
+    Approximate stores may pad short neighbour lists with -1.
+    """
+    ids = indices[index_of_movie, :count]
+    return ids[ids >= 0]
+
+
+def neighbor_graph(indices, scores):
+    """Return neighbour lists as an (N, N) CSR matrix of similarity scores."""
+    n, k = indices.shape
+    valid = np.asarray(indices) >= 0
+    rows = np.repeat(np.arange(n, dtype=np.int32), k).reshape(n, k)[valid]
+    return sparse.csr_matrix((np.asarray(scores)[valid], (rows, np.asarray(indices)[valid])),
+                             shape=(n, n), dtype=np.float32)
+
+
+def history_matrix(histories, n, weights=None):
+    """Return a (users, N) CSR matrix from per-user lists of movie ids."""
+    lengths = [len(history) for history in histories]
+    cols = np.fromiter((i for history in histories for i in history), dtype=np.int64,
+                       count=sum(lengths))
+    rows = np.repeat(np.arange(len(histories)), lengths)
+    if weights is None:
+        data = np.ones(len(cols), dtype=np.float32)
+    else:
+        data = np.fromiter((w for user in weights for w in user), dtype=np.float32, count=len(cols))
+    # Duplicate (user, movie) pairs are summed
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(histories), n))
+
+
+def _top_row(ids, values, count):
+    if len(ids) > count:
+        top = np.argpartition(-values, count - 1)[:count]
+        ids, values = ids[top], values[top]
+    order = np.lexsort((ids, -values))
+    return ids[order], values[order]
+
+
+def recommend_batch(graph, histories, count=14, weights=None):
+    """Recommend for many users at once.
+
+    ``histories`` is a list of movie-id lists (optionally with matching
+    ``weights``) or a ready (users, N) sparse matrix. All users are scored
+    by one sparse matrix product; titles already in a user's history are
+    excluded. Returns ``(ids, scores)`` arrays of shape (users, count),
+    padded with id -1 and score 0.
+    """
+    if sparse.issparse(histories):
+        seen = sparse.csr_matrix(histories, dtype=np.float32)
+    else:
+        seen = history_matrix(histories, graph.shape[0], weights)
+    scores = (seen @ graph).tocsr()
+    # Drop already-seen titles
+    scores = scores - scores.multiply(seen != 0)
+    scores.eliminate_zeros()
+
+    ids = np.full((seen.shape[0], count), -1, dtype=np.int32)
+    values = np.zeros((seen.shape[0], count), dtype=np.float32)
+    for user in range(seen.shape[0]):
+        start, stop = scores.indptr[user], scores.indptr[user + 1]
+        row_ids, row_values = _top_row(scores.indices[start:stop], scores.data[start:stop], count)
+        ids[user, :len(row_ids)] = row_ids
+        values[user, :len(row_ids)] = row_values
+    return ids, values
+
+
+def recommend_from_history(graph, history, weights=None, count=14):
+    """Recommend for one watch history (movie ids, optional weights)."""
+    ids, values = recommend_batch(graph, [history], count,
+                                  None if weights is None else [weights])
+    valid = ids[0] >= 0
+    return ids[0][valid], values[0][valid]
+
+
+def build_store(path, feature_vectors, titles, k=50, source_checksum="", mode="exact"):
+    """Compute the top-k neighbours of every movie and write them to ``path``.
+
+    ``mode="ann"`` uses the approximate IVF index from ``movie_ann`` for
+    catalogs too large for the exact blockwise pass.
+    """
+    if mode == "ann":
+        from movie_ann import IVFIndex
+        indices, scores = IVFIndex().fit(feature_vectors).neighbors_all(k)
+    elif mode == "exact":
+        indices, scores = topk_neighbors(feature_vectors, k)
+    else:
+        raise ValueError(f"unknown neighbour mode '{mode}'")
+    write_store(path, indices, scores, titles, source_checksum)
+    return indices, scores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute top-k movie neighbours")
+    parser.add_argument("movies_csv", nargs="?", default=config.MOVIES_CSV)
+    parser.add_argument("-o", "--output", default=config.MOVIE_NEIGHBORS_PATH)
+    parser.add_argument("-k", type=int, default=config.MOVIE_NEIGHBORS_K)
+    parser.add_argument("--mode", choices=("exact", "ann"), default=config.MOVIE_NEIGHBORS_MODE)
+    args = parser.parse_args(argv)
+
+    # Imported here: tfidf_cache depends on this module
+    from tfidf_cache import load_or_fit
+
+    start = time.perf_counter()
+    movies_data = pd.read_csv(args.movies_csv)
+    checksum = file_checksum(args.movies_csv)
+    _, feature_vectors = load_or_fit(movies_data, checksum)
+    indices, scores = build_store(args.output, feature_vectors, movies_data['title'].tolist(),
+                                  args.k, checksum, args.mode)
+    print(f"{len(indices)} movies, k={indices.shape[1]}, "
+          f"{indices.nbytes + scores.nbytes:,} bytes in {time.perf_counter() - start:.1f}s "
+          f"-> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
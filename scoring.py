@@ -0,0 +1,31 @@
+"""Single-pass prediction helpers."""
+
+import numpy as np
+
+
+def model_input(model, X):
+    """Return ``X`` (a DataFrame or 2-D array) as the model expects it.
+
+    Models fitted on a DataFrame get a DataFrame (so sklearn can check the
+    column names); models fitted on a bare array get a float array.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None:
+        import pandas as pd
+
+        return X if isinstance(X, pd.DataFrame) else pd.DataFrame(X, columns=names)
+    return np.ascontiguousarray(X, dtype=np.float64)
+
+
+def predict_with_proba(model, X):
+    """Return ``(labels, proba)`` from one pass over the model.
+
+    The label is taken from the class with the highest probability instead of
+    running ``predict`` a second time. Models without ``predict_proba`` (e.g.
+    an SVC fitted with ``probability=False``) fall back to ``predict`` and
+    return ``None`` for the probabilities.
+    """
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(X)
+        return model.classes_[np.argmax(proba, axis=1)], proba
+    return model.predict(X), None
@@ -0,0 +1,231 @@
+"""Local JSON/HTTP inference server for every shipped model.
+
+All models are loaded once at startup and stay warm in memory. Inputs use
+the same column names and encodings as the apps (see ``features.py``), so
+``{"cp": "ASYMPTOMATIC (3)"}`` or ``{"Contract": "One year"}`` work as-is.
+
+    python serve.py --port 8000
+
+    POST /predict/<model>   body: one object, a list of objects or {"rows": [...]}
+    GET  /health            loaded models
+    GET  /metrics           per-endpoint latency, micro-batching stats and
+                            model load timings
+
+Single-row requests are coalesced per model by ``microbatch.MicroBatcher``
+(see ``--max-wait-ms``); multi-row requests are scored directly.
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import sys
+import time
+import traceback
+from http import HTTPStatus
+
+import numpy as np
+import pandas as pd
+
+from features import MODELS
+from metrics import LatencyWindow
+from microbatch import MicroBatcher
+from model_registry import registry_stats
+from scoring import model_input, predict_with_proba
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class InferenceServer:
+    """Routes HTTP requests to warm models and records their latency."""
+
+    def __init__(self, model_names=None, max_batch_size=64, max_wait_ms=2.0):
+        self.models = {}
+        self.batchers = {}
+        self.latency = collections.defaultdict(LatencyWindow)
+        for name in model_names or MODELS:
+            spec = MODELS[name]
+            try:
+                self.models[name] = (spec, spec.load())
+            except FileNotFoundError:
+                print(f"Skipping '{name}': {spec.path} not found", file=sys.stderr)
+                continue
+            if max_wait_ms > 0:
+                self.batchers[name] = MicroBatcher(self.models[name][1], max_batch_size, max_wait_ms)
+
+    async def predict(self, name, rows):
+        """Score a list of ``{column: value}`` dicts.
+
+        A single row joins the model's micro-batch; several rows are already
+        a batch and get one model call of their own in the executor.
+        """
+        spec, model = self.models[name]
+        if len(rows) == 1 and name in self.batchers:
+            # submit() copies the row before handing it to the batcher thread
+            X = spec.schema.fill_row(rows[0])
+            label, row_proba = await asyncio.wrap_future(self.batchers[name].submit(X))
+            labels = np.asarray([label])
+            proba = None if row_proba is None else row_proba[np.newaxis]
+        else:
+            loop = asyncio.get_running_loop()
+            labels, proba = await loop.run_in_executor(None, score_rows, spec, model, rows)
+        return format_predictions(model, labels, proba)
+
+    async def dispatch(self, method, path, body):
+        if path == "/health":
+            return {"status": "ok", "models": sorted(self.models)}
+        if path == "/metrics":
+            return {
+                "endpoints": {key: window.summary() for key, window in self.latency.items()},
+                "batching": {name: batcher.stats() for name, batcher in self.batchers.items()},
+                "models": registry_stats(),
+            }
+        if path.startswith("/predict/"):
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "use POST")
+            name = path[len("/predict/"):]
+            if name not in self.models:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"unknown model '{name}'")
+            rows = parse_rows(body)
+            try:
+                predictions = await self.predict(name, rows)
+            except ValueError as e:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from None
+            return {"model": name, "predictions": predictions}
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"no route for {path}")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                start = time.perf_counter()
+                try:
+                    status, payload = HTTPStatus.OK, await self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception:
+                    # A bug in one request must not leave the client waiting
+                    traceback.print_exc()
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal server error"}
+                if status != HTTPStatus.NOT_FOUND:
+                    self.latency[f"{method} {path}"].record(time.perf_counter() - start)
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            await write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+
+def score_rows(spec, model, rows):
+    """Encode and score several rows; runs in the executor, off the event loop."""
+    # Filled and scored on the same thread, so its reusable buffer is safe here
+    X = spec.schema.fill(pd.DataFrame(rows))
+    return predict_with_proba(model, model_input(model, X))
+
+
+def format_predictions(model, labels, proba):
+    results = []
+    for i, label in enumerate(labels.tolist()):
+        result = {"prediction": label}
+        if proba is not None:
+            result["probabilities"] = dict(zip(map(str, model.classes_.tolist()), proba[i].tolist()))
+        results.append(result)
+    return results
+
+
+def parse_rows(body):
+    try:
+        data = json.loads(body or b"null")
+    except json.JSONDecodeError as e:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}") from None
+    if isinstance(data, dict):
+        data = data.get("rows", [data])
+    if not isinstance(data, list) or not data or not all(isinstance(row, dict) for row in data):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "expected an object or a non-empty list of objects")
+    return data
+
+
+async def read_request(reader):
+    """Return ``(method, path, headers, body)`` or ``None`` on EOF."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+async def write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve(host, port, model_names=None, max_batch_size=64, max_wait_ms=2.0):
+    server = InferenceServer(model_names, max_batch_size, max_wait_ms)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Serving {sorted(server.models)} on http://{host}:{port}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON/HTTP inference server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS),
+                        help="models to serve (default: all available)")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="micro-batching window; 0 disables batching")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.models,
+                          args.max_batch_size, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
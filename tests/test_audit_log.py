@@ -0,0 +1,121 @@
+import hashlib
+import os
+
+import pytest
+
+import audit_log
+from audit_log import AuditLog, read_audit
+
+CHECKSUM = hashlib.sha256(b"model").hexdigest()
+COLUMNS = ["a", "b", "c"]
+
+
+class FailOnce:
+    """Raw file wrapper whose first write stores half the data, then fails."""
+
+    def __init__(self, file, error=OSError("disk full")):
+        self.file = file
+        self.error = error
+        self.failed = False
+
+    def write(self, data):
+        if not self.failed:
+            self.failed = True
+            self.file.write(bytes(data[:len(data) // 2]))
+            raise self.error
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def make_log(directory):
+    return AuditLog("heart", COLUMNS, directory=str(directory), capacity=64,
+                    flush_seconds=0.05, block_seconds=5)
+
+
+def record(log, rows):
+    for i in rows:
+        log.record(CHECKSUM, [[i, i + 0.5, -i]], [i % 2], [[0.25, 0.75]])
+
+
+def check(directory, rows):
+    records = read_audit(str(directory))["heart"]
+    assert records["label"].tolist() == [i % 2 for i in rows]
+    assert records["inputs"].tolist() == [[i, i + 0.5, -i] for i in rows]
+    assert (records["checksum"] == CHECKSUM).all()
+
+
+def test_failed_block_write_is_retried_whole(tmp_path):
+    log = make_log(tmp_path)
+    record(log, range(3))
+    assert log.flush(5)
+
+    log._file = FailOnce(log._file)
+    record(log, range(3, 8))
+    assert log.flush(5)
+    assert log.stats()["write_errors"] == 1
+    log.close()
+    check(tmp_path, range(8))
+
+
+def test_writer_survives_unexpected_errors(tmp_path):
+    log = make_log(tmp_path)
+    record(log, range(3))
+    assert log.flush(5)
+
+    log._file = FailOnce(log._file, RuntimeError("bug"))
+    record(log, range(3, 8))
+    assert log.flush(5)
+    assert log._thread.is_alive()
+    assert log.stats()["write_errors"] == 1
+    assert log.error is None
+    log.close()
+    check(tmp_path, range(8))
+
+
+def test_failed_header_write_leaves_no_file(tmp_path, monkeypatch):
+    real_open = open
+    calls = []
+
+    def failing_open(path, *args, **kwargs):
+        file = real_open(path, *args, **kwargs)
+        if str(path).endswith(".audit") and not calls:
+            calls.append(path)
+            return FailOnce(file)
+        return file
+
+    monkeypatch.setattr(audit_log, "open", failing_open, raising=False)
+    log = make_log(tmp_path)
+    record(log, range(4))
+    assert log.flush(5)
+    log.close()
+    assert not os.path.exists(calls[0])
+    check(tmp_path, range(4))
+
+
+def test_corrupt_block_in_the_middle_raises(tmp_path):
+    log = make_log(tmp_path)
+    record(log, range(2))
+    assert log.flush(5)
+    record(log, range(2, 4))
+    log.close()
+    (path,) = tmp_path.iterdir()
+    data = bytearray(path.read_bytes())
+    second_block = data.rindex(audit_log.BLOCK_MAGIC)
+    data[second_block] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="corrupt block"):
+        read_audit(str(tmp_path))
+
+
+def test_cut_off_last_block_is_skipped(tmp_path):
+    log = make_log(tmp_path)
+    record(log, range(2))
+    assert log.flush(5)
+    record(log, range(2, 4))
+    log.close()
+    (path,) = tmp_path.iterdir()
+    os.truncate(path, path.stat().st_size - 5)
+    with pytest.warns(UserWarning, match="truncated last block"):
+        check(tmp_path, range(2))
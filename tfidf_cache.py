@@ -0,0 +1,72 @@
+"""Persisted, checksum-keyed TF-IDF pipeline for the movie catalog.
+
+The fitted vocabulary, IDF weights and the sparse TF-IDF matrix (CSR
+arrays) are stored in one ``.npz`` file named after the SHA-256 of
+movies.csv. Reloading is a few array reads; the vectorizer is only refitted
+when the CSV changes. No pickle is involved, so any process can share the
+cache directory.
+"""
+
+import glob
+import os
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import config
+from recommender import vectorize
+
+CACHE_DIR = os.path.join(config.CACHE_DIR, "tfidf")
+
+
+def cache_path(checksum, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"tfidf-{checksum}.npz")
+
+
+def save_tfidf(path, vectorizer, feature_vectors):
+    """Write vocabulary, IDF and CSR arrays atomically."""
+    feature_vectors = feature_vectors.tocsr()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as file:
+        np.savez(
+            file,
+            terms=vectorizer.get_feature_names_out().astype(str),
+            idf=vectorizer.idf_,
+            data=feature_vectors.data,
+            indices=feature_vectors.indices,
+            indptr=feature_vectors.indptr,
+            shape=np.array(feature_vectors.shape),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_tfidf(path):
+    """Return ``(vectorizer, feature_vectors)`` from a cache file."""
+    with np.load(path, allow_pickle=False) as data:
+        feature_vectors = sparse.csr_matrix(
+            (data["data"], data["indices"], data["indptr"]), shape=tuple(data["shape"]))
+        vectorizer = TfidfVectorizer(vocabulary=data["terms"].tolist())
+        vectorizer.idf_ = data["idf"]
+    return vectorizer, feature_vectors
+
+
+def load_or_fit(movies_data, checksum, cache_dir=CACHE_DIR):
+    """Return the TF-IDF pipeline for ``movies_data``, fitting it at most once.
+
+    ``checksum`` identifies the source CSV; stale cache files for other
+    checksums are removed after a refit.
+    """
+    path = cache_path(checksum, cache_dir)
+    try:
+        return load_tfidf(path)
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    vectorizer, feature_vectors = vectorize(movies_data)
+    save_tfidf(path, vectorizer, feature_vectors)
+    for stale in glob.glob(os.path.join(cache_dir, "tfidf-*.npz")):
+        if stale != path:
+            os.remove(stale)
+    return vectorizer, feature_vectors
@@ -0,0 +1,79 @@
+"""Typo-tolerant movie title lookup backed by a character-trigram index.
+
+``difflib.get_close_matches`` compares the query against every title. Here
+an inverted index from trigrams to title ids narrows the search to titles
+sharing the most trigrams with the query, and only those candidates are
+ranked with difflib's ratio, so the result follows the same similarity
+measure and cutoff. ``row_of`` maps a title to its row in O(1).
+"""
+
+import difflib
+import heapq
+
+import numpy as np
+
+
+def trigrams(text):
+    """Return the set of lower-cased character trigrams of ``text``."""
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """Inverted trigram index over a list of titles."""
+
+    def __init__(self, titles, max_candidates=64):
+        self.titles = [str(title) for title in titles]
+        self.max_candidates = max_candidates
+
+        # First row wins, like movies_data[movies_data.title == t].index[0]
+        self.row_of = {}
+        for row, title in enumerate(self.titles):
+            self.row_of.setdefault(title, row)
+
+        postings = {}
+        sizes = np.empty(len(self.titles), dtype=np.int32)
+        for title_id, title in enumerate(self.titles):
+            grams = trigrams(title)
+            sizes[title_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(title_id)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._sizes = sizes
+
+    def __len__(self):
+        return len(self.titles)
+
+    def candidates(self, query):
+        """Return ids of the titles sharing the most trigrams with ``query``."""
+        grams = trigrams(query)
+        lists = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+        ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+
+        # Dice coefficient on trigram sets
+        score = 2.0 * shared / (len(grams) + self._sizes[ids])
+        if len(ids) > self.max_candidates:
+            top = np.argpartition(score, len(ids) - self.max_candidates)[-self.max_candidates:]
+            ids = ids[top]
+        return ids
+
+    def lookup(self, query, n=3, cutoff=0.6):
+        """Like ``difflib.get_close_matches(query, titles, n, cutoff)``.
+
+        An exact title short-circuits and is returned on its own.
+        """
+        if query in self.row_of:
+            return [query]
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query)
+        scored = []
+        for title_id in self.candidates(query):
+            title = self.titles[title_id]
+            matcher.set_seq1(title)
+            if (matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff
+                    and matcher.ratio() >= cutoff):
+                scored.append((matcher.ratio(), title))
+        return [title for _, title in heapq.nlargest(n, scored)]
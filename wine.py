@@ -1,8 +1,8 @@
 import streamlit as st
-import joblib
+from features import MODELS
+from prediction_cache import get_cache
 import numpy as np
-import time
-import os
+from metrics import StageTimer, write_prometheus
 
 # Page Configuration
 st.set_page_config(page_title="🍷 Wine Quality Predictor", layout="centered", page_icon="🍇")
@@ -21,9 +21,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load the model
+stages = StageTimer("wine")
 try:
-    with open("wine_quality_model.pkl", "rb") as file:
-        model = joblib.load(file)
+    entry = MODELS["wine"].entry()
+    stages.lap("load")
     st.sidebar.success("✅ Model loaded successfully!")
 except FileNotFoundError:
     st.sidebar.error("❌ Model file not found!")
@@ -48,19 +49,17 @@ alcohol = st.sidebar.number_input("🍷 Alcohol %", 0.0, 20.0, step=0.1)
 
 # Predict Button
 if st.button("🔍 Predict Wine Quality"):
-    with st.spinner("Analyzing wine quality... 🍷"):
-        progress = st.progress(0)
-        for i in range(100):
-            time.sleep(0.01)
-            progress.progress(i + 1)
+    stages.restart()
 
     # Prepare and predict
     input_data = np.array([[fixed_acidity, volatile_acidity, citric_acid, residual_sugar,
                             chlorides, free_sulfur_dioxide, total_sulfur_dioxide,
                             density, pH, sulphates, alcohol]])
+    stages.lap("input")
 
-    prediction = model.predict(input_data)
-    prediction_proba = model.predict_proba(input_data)[0]
+    prediction, prediction_proba = get_cache("wine").predict(entry, input_data)
+    prediction_proba = prediction_proba[0]
+    stages.lap("predict")
 
     # Display Prediction
     st.markdown("---")
@@ -74,6 +73,8 @@ if st.button("🔍 Predict Wine Quality"):
     else:
         st.error("⚠️ This wine might be **LOW QUALITY**.")
         st.markdown(f"<div style='text-align: center; font-size: 20px;'>💔 Confidence: <strong>{int(prediction_proba[0]*100)}%</strong></div>", unsafe_allow_html=True)
+    stages.lap("render")
+    write_prometheus()
 
 # Sidebar Footer
 st.sidebar.markdown("---")